@@ -1,28 +1,124 @@
-import subprocess, os
+import subprocess, os, json, time, threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from get_a_single_tab import get_browser_url_specific
 from get_all_tabs import get_all_pixiv_tabs
 from utilities import get_config
 
-def download(urls, base_dir, db):
+MAX_JOBS = 4  # gallery-dl processes running at the same time
+HOST_JOBS = 2  # Of those, at most this many against the same host
+HOST_INTERVAL = 3.0  # Minimum seconds between two job starts on the same host
+WAITING_JOBS = 8  # Threads per running job; jobs waiting on a busy host must not block other hosts
+SUMMARY_FILE = "download_summary.json"  # Written to base_dir after every run
+# gallery-dl exit status bits
+EXIT_CODES = {1: "error", 2: "usage", 4: "http error", 8: "not found", 16: "auth", 32: "format",
+              64: "unsupported", 128: "filter"}
+
+class HostRateLimiter:
+    """Caps concurrent jobs per host and spaces out their starts"""
+    def __init__(self, max_jobs=HOST_JOBS, interval=HOST_INTERVAL):
+        self.max_jobs = max_jobs
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.slots = {}  # Host -> semaphore
+        self.next_start = {}  # Host -> earliest monotonic time of the next job start
+
+    def acquire(self, host):
+        with self.lock:
+            slot = self.slots.setdefault(host, threading.Semaphore(self.max_jobs))
+        slot.acquire()
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start.get(host, 0.0))
+            self.next_start[host] = start + self.interval
+        time.sleep(start - now)
+
+    def release(self, host):
+        self.slots[host].release()
+
+def describe_exit_code(code):
+    if code == 0:
+        return "ok"
+    if code < 0:
+        return "killed"
+    return ", ".join(name for bit, name in EXIT_CODES.items() if code & bit) or f"exit {code}"
+
+def run_job(url, base_dir, limiter, slots):
+    """Run one gallery-dl process and return its stats"""
     archive_dir = os.path.join(base_dir, "pixiv_archive.txt")
-    for url in urls:
-        # duplicate_check = check_database(url, db)
-        """         if duplicate_check:
-            print(f"Previously downloaded!\n    Skipping {url}")
-            continue """
-        os.makedirs(base_dir, exist_ok=True)
-        command = [
-        "gallery-dl",
-        "-d", base_dir,
-        "--download-archive", archive_dir,
-        "--config", ".\\config\\config.json",
-        "--write-metadata",
-        "--filter=rating=='r18'",
-        url
-        ]
+    command = [
+    "gallery-dl",
+    "-d", base_dir,
+    "--download-archive", archive_dir,
+    "--config", ".\\config\\config.json",
+    "--write-metadata",
+    "--filter=rating=='r18'",
+    url
+    ]
+    host = urlparse(url).netloc
+    limiter.acquire(host)
+    slots.acquire()
+    started = time.monotonic()
+    try:
         print(f"Download for starting: {url}")
-        subprocess.run(command)  # Queues all the downloads
-        print("Finished download!")
+        result = subprocess.run(command, capture_output=True, text=True, encoding="utf-8", errors="replace")
+        exit_code, stdout, stderr = result.returncode, result.stdout, result.stderr
+    except OSError as e:  # gallery-dl missing or not executable
+        exit_code, stdout, stderr = -1, "", str(e)
+    finally:
+        slots.release()
+        limiter.release(host)
+    # gallery-dl prints one line per file: the path when downloaded, "# path" when skipped
+    lines = [line for line in stdout.splitlines() if line.strip()]
+    skipped = sum(1 for line in lines if line.startswith("# "))
+    errors = [line for line in stderr.splitlines() if "[error]" in line or exit_code == -1]
+    return {
+        "url": url,
+        "host": host,
+        "exit_code": exit_code,
+        "status": describe_exit_code(exit_code),
+        "downloaded": len(lines) - skipped,
+        "skipped": skipped,
+        "seconds": round(time.monotonic() - started, 1),
+        "error": errors[-1].strip() if errors else "",
+    }
+
+def write_summary(results, base_dir, elapsed):
+    summary = {
+        "finished": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "seconds": round(elapsed, 1),
+        "jobs": len(results),
+        "failed": sum(1 for result in results if result["exit_code"] != 0),
+        "downloaded": sum(result["downloaded"] for result in results),
+        "skipped": sum(result["skipped"] for result in results),
+        "results": results,
+    }
+    with open(os.path.join(base_dir, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"{summary['jobs']} jobs in {summary['seconds']}s: {summary['downloaded']} downloaded, "
+          f"{summary['skipped']} skipped, {summary['failed']} failed. Summary: {SUMMARY_FILE}")
+    return summary
+
+def download(urls, base_dir, db, max_jobs=MAX_JOBS, limiter=None):
+    """Run gallery-dl for every URL, max_jobs at a time, and write a summary to base_dir"""
+    os.makedirs(base_dir, exist_ok=True)
+    limiter = limiter or HostRateLimiter()
+    # duplicate_check = check_database(url, db)
+    """ if duplicate_check:
+        print(f"Previously downloaded!\n    Skipping {url}")
+        continue """
+
+    started = time.monotonic()
+    results = []
+    slots = threading.BoundedSemaphore(max_jobs)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(urls), max_jobs * WAITING_JOBS))) as pool:
+        futures = [pool.submit(run_job, url, base_dir, limiter, slots) for url in urls]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"Finished download ({result['status']}, {result['downloaded']} new, "
+                  f"{result['seconds']}s): {result['url']}")
+    return write_summary(results, base_dir, time.monotonic() - started)
 
 def update_authors(author_urls, base_dir, db):
     print("Updating authors")
@@ -63,10 +159,8 @@ def download_tabs(base_dir, db):
 
 def check_database(url, db):
     id = url.split("/")[-1]
-    db.reconnect("pixiv.db")
-    repeated = db.is_url_downloaded(id)
-    db.close_conn()
-    return repeated
+    db.shared_pool()  # Opened once and shared by every check, instead of reconnecting for every URL
+    return db.is_url_downloaded(id)
 
 # Test script
 if __name__ == "__main__":
@@ -1,6 +1,168 @@
-import os, json, time, re, sys, shutil, sqlite3
+import os, json, time, re, sys, shutil, sqlite3, queue, threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 # Secondary requirements: pip install openpyxl
+BULK_BATCH_SIZE = 5000  # JSON sidecars parsed and inserted per transaction in bulk mode
+PARSE_CHUNK_SIZE = 64  # Files handed to a parser process at a time
+DOWNLOADED_TABLE = "downloaded_ids"  # Global index: artwork ID -> metadata table it was ingested into
+NORMALIZED_TABLES = ("artists", "works", "tags", "work_tags")  # Alternative layout, see JSONhandler(normalized=True)
+SEARCH_TABLE = "search_index"  # FTS5 index over title, caption, tags and user name (rowid = artwork ID)
+SEARCH_WEIGHTS = (10.0, 1.0, 5.0, 3.0)  # bm25 weights of title, caption, tags, user
+SEARCH_PAGE_SIZE = 50
+INTERNAL_TABLES = (DOWNLOADED_TABLE, SEARCH_TABLE) + NORMALIZED_TABLES  # Tables that are not per-artist metadata tables
+# gallery-dl fields promoted to works columns; everything else stays in works.metadata as JSON
+WORK_COLUMNS = ("title", "caption", "date", "width", "height", "page_count", "total_bookmarks", "total_view", "x_restrict")
+NORMALIZED_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS artists (id INTEGER PRIMARY KEY, name TEXT, account TEXT, table_name TEXT);",
+    "CREATE INDEX IF NOT EXISTS artists_name ON artists (name COLLATE NOCASE);",
+    "CREATE INDEX IF NOT EXISTS artists_account ON artists (account COLLATE NOCASE);",
+    "CREATE TABLE IF NOT EXISTS works (id INTEGER PRIMARY KEY, artist_id INTEGER REFERENCES artists (id), filename TEXT, "
+    + ", ".join(f"{column} {'TEXT' if column in ('title', 'caption', 'date') else 'INTEGER'}" for column in WORK_COLUMNS)
+    + ", metadata TEXT);",
+    "CREATE INDEX IF NOT EXISTS works_artist ON works (artist_id);",
+    "CREATE TABLE IF NOT EXISTS tags (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE COLLATE NOCASE);",
+    "CREATE TABLE IF NOT EXISTS work_tags (tag_id INTEGER NOT NULL REFERENCES tags (id), "
+    "work_id INTEGER NOT NULL REFERENCES works (id), PRIMARY KEY (tag_id, work_id)) WITHOUT ROWID;",
+    "CREATE INDEX IF NOT EXISTS work_tags_work ON work_tags (work_id);",
+)
+POOL_SIZE = 4  # Connections shared by the threads using a ConnectionPool
+STATEMENT_CACHE_SIZE = 256  # Prepared statements kept per connection (keyed by SQL text)
+# Hot queries: constant SQL text, so every call reuses the prepared statement
+TABLE_EXISTS_QUERY = "SELECT 1 FROM sqlite_master WHERE type='table' AND name = ?;"
+DOWNLOADED_QUERY = f'SELECT id FROM "{DOWNLOADED_TABLE}" WHERE id IN (SELECT value FROM json_each(?));'
+SWEEP_WORKERS = 8  # Top-level folders scanned at the same time by the duplicate sweep
+DELETE_BATCH_SIZE = 1000  # Duplicates removed between progress reports
+ARTWORK_FILE = re.compile(r'(\d+)(?:_p\d+)?\.')  # "{id}_p{num}.{extension}" images and "{id}.json" sidecars
+
+def _column_type(value):
+    """SQLite column type for the first value seen in a new column"""
+    if isinstance(value, int):
+        return "INTEGER"
+    elif isinstance(value, float):
+        return "REAL"
+    return "TEXT"
+
+def _artwork_id(row):
+    """Pixiv artwork ID of a metadata row, from its id field or its "{id}" filename"""
+    for value in (row.get("id"), row.get("filename")):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+def _scan_artworks(folder, table_name):
+    """Return (artwork ID, table, path) for every artwork file below folder, using scandir only"""
+    found = []
+    pending = [folder]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    match = ARTWORK_FILE.match(entry.name)
+                    if match:
+                        found.append((int(match.group(1)), table_name, entry.path))
+        except OSError:
+            continue
+    return found
+
+def _decoded(value):
+    """Lists/dicts that were stored as JSON text, decoded again"""
+    if isinstance(value, str) and value[:1] in ("{", "["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+def _search_fields(row):
+    """(title, caption, tags, user) text of a metadata row for the search index"""
+    caption = re.sub(r'<[^>]+>', ' ', str(row.get("caption") or ""))  # Pixiv captions are HTML
+    tags = _decoded(row.get("tags")) or []
+    if isinstance(tags, str):
+        tags = tags.split(";")
+    tags = " ".join(str(tag.get("name") if isinstance(tag, dict) else tag) for tag in tags)
+    user = _decoded(row.get("user"))
+    user = " ".join(str(user.get(key) or "") for key in ("name", "account")) if isinstance(user, dict) else ""
+    return str(row.get("title") or ""), caption, tags, user.strip()
+
+def _read_sidecar(json_path):
+    """Parse one gallery-dl metadata file into (json_path, table, row) in a worker process.
+    The table is None (and the row an error message) when the file cannot be read."""
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return json_path, None, str(e)
+    data["filename"] = os.path.basename(json_path).split(".")[0]
+    if isinstance(data.get("tags"), list):
+        data["tags"] = ";".join(data["tags"])
+    for key, value in data.items():  # Lists/dicts are stored as JSON text, as in _insert_metadata_dynamic
+        if isinstance(value, (list, dict)):
+            data[key] = json.dumps(value, ensure_ascii=False)
+    return json_path, os.path.basename(os.path.dirname(json_path)), data
+
 ################################################################################
+class ConnectionPool:
+    '''Thread-safe pool of SQLite connections to one database file, configured with the same PRAGMAs'''
+    JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+    SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+    def __init__(self, db_path, size=POOL_SIZE, journal_mode=None, synchronous="NORMAL",
+                 cache_size=-65536, mmap_size=256 * 1024 * 1024, timeout=30):
+        if journal_mode is not None and journal_mode.upper() not in self.JOURNAL_MODES \
+                or synchronous.upper() not in self.SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Unsupported journal_mode/synchronous: {journal_mode}/{synchronous}")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = (f"PRAGMA synchronous={synchronous};", f"PRAGMA cache_size={int(cache_size)};",
+                        f"PRAGMA mmap_size={int(mmap_size)};")
+        if journal_mode is not None:  # Persistent in the database file, so only changed on request
+            self.pragmas = (f"PRAGMA journal_mode={journal_mode};",) + self.pragmas
+        self.idle = queue.LifoQueue()  # Most recently used first: its page cache is warm
+        self.created = 0
+        self.lock = threading.Lock()
+        self.connections = []
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        '''Borrow a connection; commits on success and rolls back on error'''
+        conn = None
+        with self.lock:
+            if self.idle.empty() and self.created < self.size:
+                self.created += 1
+                conn = self._connect()
+                self.connections.append(conn)
+        if conn is None:
+            conn = self.idle.get(timeout=self.timeout)  # Wait for another thread to return one
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.idle.put(conn)
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+            self.created = 0
+            self.idle = queue.LifoQueue()
+
 class Database:
     '''SQLite custom handler'''
     def __init__(self, db_name: str, rel_path=None):
@@ -14,6 +176,8 @@ class Database:
         
         self.conn = None
         self.cursor = None
+        self.pool = None  # Optional ConnectionPool, see open_pool
+        self.pool_lock = threading.Lock()
         if not os.path.exists(self.db_path):  # Check if the database file exists before connecting
             print(f"Database *{db_name}* created in: {self.db_path}")
         else:
@@ -74,7 +238,7 @@ class Database:
                     self.cursor.execute(f"PRAGMA table_info({table_name})")
                     columns_info = self.cursor.fetchall()
                     column_name = columns_info[0][1]
-                    self.cursor.execute(f"DELETE FROM {table_name} WHERE {column_name} = '{row}'")
+                    self.cursor.execute(f'DELETE FROM "{table_name}" WHERE "{column_name}" = ?', (row,))
                     self.conn.commit()
                     print(f"{row} dropped successfully.")
                 print(f"Row(s) deleted from table *{table_name}*")
@@ -129,9 +293,28 @@ class Database:
         except Exception as e:
             raise Exception(f"Error while examining tables: {str(e)}")
 
+    def open_pool(self, size=POOL_SIZE, **pragmas):
+        '''Opens a thread-safe connection pool (synchronous, cache_size, mmap_size, journal_mode if given) that
+        lookups use instead of the main connection, so parallel workers can share this object'''
+        if self.pool is not None:
+            self.pool.close()
+        self.pool = ConnectionPool(self.db_path, size, **pragmas)
+        self.pool_options = dict(pragmas, size=size)  # Reused when reconnecting to another database
+        return self.pool
+
+    def shared_pool(self):
+        '''Returns the connection pool, opening it with the default settings on first use (thread-safe)'''
+        with self.pool_lock:
+            if self.pool is None:
+                self.open_pool()
+            return self.pool
+
     def close_conn(self, verbose=True):
         '''Closes the database connection when done'''
         try:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool = None
             self.conn.close()
             print(f"Closed connection to: {self.db_path}") if verbose else None
         except Exception as e:
@@ -149,6 +332,8 @@ class Database:
         try:
             self.conn = sqlite3.connect(self.db_path)
             self.cursor = self.conn.cursor()
+            if self.pool is not None and self.pool.db_path != self.db_path:
+                self.open_pool(**self.pool_options)
             print(f"Connected to {self.db_path}") if verbose else None
         except Exception as e:
             print(f"Error trying to connect: {e}")
@@ -187,10 +372,12 @@ class Database:
             raise Exception(f"Unsupported input format: Try str, list, tuple.")
 
 class JSONhandler(Database):
-    def __init__(self, db_name: str, rel_path=None):
+    def __init__(self, db_name: str, rel_path=None, normalized=False):
         """Initialize the JSONhandler with the database connection."""
         # Call the parent class constructor (Database's __init__)
         super().__init__(db_name, rel_path)
+        self.known_columns = {}  # Table -> set of column names, filled on first use in bulk mode
+        self.normalized = normalized  # Store metadata in works/artists/tags instead of one table per artist
 
     def _sanitize_table_name(self, table_name):
         """Sanitize the table name to ensure it follows SQLite's naming rules."""
@@ -214,12 +401,7 @@ class JSONhandler(Database):
             # Add missing columns
             for key, value in metadata.items():
                 if key not in existing_columns:
-                    if isinstance(value, int):
-                        dtype = "INTEGER"
-                    elif isinstance(value, float):
-                        dtype = "REAL"
-                    else:
-                        dtype = "TEXT"
+                    dtype = _column_type(value)
                     try:
                         self.cursor.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{key}" {dtype};')
                     except sqlite3.Error as e:
@@ -246,12 +428,18 @@ class JSONhandler(Database):
                 f'INSERT OR IGNORE INTO "{table_name}" ({column_names}) VALUES ({placeholders});',
                 values
             )
+            self._index_rows(table_name, [metadata])
             self.conn.commit()
         except sqlite3.Error as e:
             print(f"Error inserting into table {table_name}: {e}")
 
-    def process_jsons(self, folder_path):
+    def process_jsons(self, folder_path, bulk=False, workers=None, batch_size=BULK_BATCH_SIZE):
             """Process all JSON files in a directory and insert their metadata into the database."""
+            if bulk:
+                return self.process_jsons_bulk(folder_path, workers, batch_size)
+            # Once up front, the inserts only add their rows
+            self._ensure_downloaded_index()
+            self._ensure_search_index()
             for root, _, files in os.walk(folder_path):
                 for file in files:
                     if file.endswith(".json"):
@@ -267,72 +455,406 @@ class JSONhandler(Database):
                         if isinstance(data.get("tags"), list):
                             data["tags"] = ";".join(data["tags"])
 
-                        self._create_table_dynamic(parent_folder, data)
-                        self._insert_metadata_dynamic(parent_folder, data)
+                        if self.normalized:
+                            self._insert_works(self._sanitize_table_name(parent_folder), [data])
+                            self.conn.commit()
+                        else:
+                            self._create_table_dynamic(parent_folder, data)
+                            self._insert_metadata_dynamic(parent_folder, data)
                         
                         # Optionally, delete the JSON file after processing it
                         os.remove(json_path)
 
+    def process_jsons_bulk(self, folder_path, workers=None, batch_size=BULK_BATCH_SIZE):
+        """Bulk version of process_jsons: parses files in parallel and inserts them per table
+        with executemany, one transaction per batch. Returns the number of files ingested."""
+        json_paths = [os.path.join(root, file) for root, _, files in os.walk(folder_path)
+                      for file in files if file.endswith(".json")]
+        if not json_paths:
+            return 0
+        # Created (and committed) before the first batch, so each batch stays a single transaction
+        self._ensure_downloaded_index()
+        self._ensure_search_index()
+        # Relaxed durability for the load; the JSON files are only deleted after their batch is committed.
+        # The journal mode is persistent in the database file, so it is left as the user set it
+        self.cursor.execute("PRAGMA synchronous;")
+        synchronous = self.cursor.fetchone()[0]
+        self.cursor.execute("PRAGMA synchronous=OFF;")
+        self.cursor.execute("PRAGMA temp_store=MEMORY;")
+        self.cursor.execute("PRAGMA cache_size=-65536;")  # 64 MiB page cache
+        ingested = 0
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for start in range(0, len(json_paths), batch_size):
+                    batch = json_paths[start:start + batch_size]
+                    tables = {}  # Table -> rows parsed in this batch
+                    done = []
+                    for json_path, table, row in pool.map(_read_sidecar, batch, chunksize=PARSE_CHUNK_SIZE):
+                        if table is None:
+                            print(f"Skipping unreadable {json_path}: {row}")
+                            continue
+                        tables.setdefault(self._sanitize_table_name(table), []).append(row)
+                        done.append(json_path)
+                    try:
+                        insert_rows = self._insert_works if self.normalized else self._insert_rows_bulk
+                        for table, rows in tables.items():
+                            insert_rows(table, rows)
+                        self.conn.commit()
+                    except sqlite3.Error as e:
+                        self.conn.rollback()
+                        self.known_columns.clear()  # Added columns may have been rolled back
+                        print(f"Error inserting batch of {len(batch)} files: {e}")
+                        continue
+                    for json_path in done:
+                        os.remove(json_path)
+                    ingested += len(done)
+                    print(f"Ingested {ingested}/{len(json_paths)} JSON files")
+        finally:
+            self.cursor.execute(f"PRAGMA synchronous={int(synchronous)};")
+        return ingested
+
+    def _table_columns(self, table_name):
+        """Cached column names of a table, created on first use"""
+        columns = self.known_columns.get(table_name)
+        if columns is None:
+            self.cursor.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" (filename TEXT);')
+            self.cursor.execute(f'PRAGMA table_info("{table_name}")')
+            columns = self.known_columns[table_name] = {row[1] for row in self.cursor.fetchall()}
+        return columns
+
+    def _insert_rows_bulk(self, table_name, rows):
+        """Add the columns missing for this batch once, then insert every row with executemany"""
+        columns = self._table_columns(table_name)
+        keys = list(dict.fromkeys(key for row in rows for key in row))  # Union, in first seen order
+        for key in keys:
+            if key not in columns:
+                value = next(row[key] for row in rows if key in row)
+                self.cursor.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{key}" {_column_type(value)};')
+                columns.add(key)
+
+        placeholders = ", ".join(["?" for _ in keys])
+        column_names = ", ".join([f'"{k}"' for k in keys])
+        self.cursor.executemany(
+            f'INSERT OR IGNORE INTO "{table_name}" ({column_names}) VALUES ({placeholders});',
+            [[row.get(key) for key in keys] for row in rows]
+        )
+        self._index_rows(table_name, rows)
+
+    def _insert_works(self, table_name, rows):
+        """Store metadata rows in the normalized layout: one works row, its artist and its tags"""
+        for statement in NORMALIZED_SCHEMA:
+            self.cursor.execute(statement)
+        artists = {}
+        works = []
+        work_tags = []
+        for row in rows:
+            work_id = _artwork_id(row)
+            if work_id is None:
+                continue
+            user = _decoded(row.get("user"))
+            artist_id = None
+            if isinstance(user, dict) and user.get("id") is not None:
+                artist_id = int(user["id"])
+                artists[artist_id] = (artist_id, user.get("name"), user.get("account"), table_name)
+            works.append([work_id, artist_id, row.get("filename")] + [row.get(column) for column in WORK_COLUMNS]
+                         + [json.dumps(row, ensure_ascii=False, default=str)])
+            tags = _decoded(row.get("tags")) or []
+            if isinstance(tags, str):
+                tags = tags.split(";")
+            for tag in tags:
+                tag = tag.get("name") if isinstance(tag, dict) else tag  # Translated tags are dicts
+                if tag:
+                    work_tags.append((str(tag), work_id))
+
+        # Newest artist name/account wins, as with a renamed account
+        self.cursor.executemany("INSERT OR REPLACE INTO artists VALUES (?, ?, ?, ?);", list(artists.values()))
+        self.cursor.executemany(
+            f"INSERT OR IGNORE INTO works VALUES ({', '.join('?' for _ in range(len(WORK_COLUMNS) + 4))});", works
+        )
+        self.cursor.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?);", {(tag,) for tag, _ in work_tags})
+        self.cursor.executemany(
+            "INSERT OR IGNORE INTO work_tags (tag_id, work_id) SELECT id, ? FROM tags WHERE name = ?;",
+            [(work_id, tag) for tag, work_id in work_tags]
+        )
+        self._index_rows(table_name, rows)
+
+    def migrate_to_normalized(self, batch_size=BULK_BATCH_SIZE):
+        """Import every per-artist table into the normalized layout; the old tables are kept.
+        Returns the number of works imported."""
+        imported = 0
+        self._ensure_downloaded_index()
+        self._ensure_search_index()
+        for table in self._metadata_tables():
+            cursor = self.conn.cursor()  # Separate cursor, self.cursor is used for the inserts
+            cursor.execute(f'SELECT * FROM "{table}";')
+            columns = [description[0] for description in cursor.description]
+            while True:
+                rows = [dict(zip(columns, values)) for values in cursor.fetchmany(batch_size)]
+                if not rows:
+                    break
+                self._insert_works(table, rows)
+                imported += len(rows)
+            self.conn.commit()
+        self.normalized = True
+        print(f"Migrated {imported} works from {len(self._metadata_tables())} tables to the normalized layout.")
+        return imported
+
+    def works_with_tags(self, tags, match_all=True, limit=None):
+        """Return (work id, title, artist name) of the works having all (or any) of the given tags"""
+        tags = self._input_handler(tags)
+        query = (
+            f"SELECT w.id, w.title, a.name FROM work_tags wt JOIN tags t ON t.id = wt.tag_id "
+            f"JOIN works w ON w.id = wt.work_id LEFT JOIN artists a ON a.id = w.artist_id "
+            f"WHERE t.name IN ({', '.join('?' for _ in tags)}) GROUP BY w.id "
+            f"{'HAVING COUNT(*) = ?' if match_all else ''} ORDER BY w.id DESC"
+        )
+        params = list(tags) + ([len(set(tag.lower() for tag in tags))] if match_all else [])
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        self.cursor.execute(query + ";", params)
+        return self.cursor.fetchall()
+
+    def works_by_artist(self, artist):
+        """Return (work id, title) of an artist's works, by user ID, name or account"""
+        if str(artist).isdigit():
+            self.cursor.execute("SELECT id, title FROM works WHERE artist_id = ? ORDER BY id DESC;", (int(artist),))
+        else:
+            self.cursor.execute(
+                "SELECT w.id, w.title FROM works w JOIN artists a ON a.id = w.artist_id "
+                "WHERE a.name = ? COLLATE NOCASE OR a.account = ? COLLATE NOCASE ORDER BY w.id DESC;",
+                (artist, artist)
+            )
+        return self.cursor.fetchall()
+
+    def _ensure_downloaded_index(self):
+        """Create the downloaded IDs index, filling it from the existing tables the first time"""
+        if self._table_exists(DOWNLOADED_TABLE):
+            return
+        self.cursor.execute(f'CREATE TABLE "{DOWNLOADED_TABLE}" (id INTEGER PRIMARY KEY, table_name TEXT NOT NULL);')
+        self.cursor.execute(f'CREATE INDEX "{DOWNLOADED_TABLE}_table" ON "{DOWNLOADED_TABLE}" (table_name);')
+        for table in self._metadata_tables():
+            self._reindex_table(table)
+        self.conn.commit()
+
+    def _index_rows(self, table_name, rows):
+        """Record freshly inserted rows in the global ID index and the search index (both created beforehand)"""
+        self.cursor.executemany(
+            f'INSERT OR REPLACE INTO "{DOWNLOADED_TABLE}" (id, table_name) VALUES (?, ?);',
+            [(artwork_id, table_name) for artwork_id in map(_artwork_id, rows) if artwork_id is not None]
+        )
+        self._index_search(table_name, rows)
+
+    def _table_exists(self, table_name):
+        self.cursor.execute(TABLE_EXISTS_QUERY, (table_name,))
+        return self.cursor.fetchone() is not None
+
+    def _ensure_search_index(self):
+        """Create the FTS5 search index, filling it from the existing tables the first time"""
+        if self._table_exists(SEARCH_TABLE):
+            return
+        self.cursor.execute(
+            f'CREATE VIRTUAL TABLE "{SEARCH_TABLE}" USING fts5(title, caption, tags, user, table_name UNINDEXED, '
+            f"tokenize='unicode61 remove_diacritics 2');"
+        )
+        for table in self._metadata_tables():
+            self._reindex_search_table(table)
+        if self._table_exists("works"):
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT w.metadata, a.table_name FROM works w LEFT JOIN artists a ON a.id = w.artist_id;")
+            while True:
+                batch = cursor.fetchmany(BULK_BATCH_SIZE)
+                if not batch:
+                    break
+                for metadata, table_name in batch:
+                    self._index_search(table_name or "", [json.loads(metadata)])
+        self.conn.commit()
+
+    def _index_search(self, table_name, rows):
+        """Add or replace the search entries of metadata rows"""
+        self.cursor.executemany(
+            f'INSERT OR REPLACE INTO "{SEARCH_TABLE}" (rowid, title, caption, tags, user, table_name) '
+            f'VALUES (?, ?, ?, ?, ?, ?);',
+            [(artwork_id, *_search_fields(row), table_name) for artwork_id, row in
+             ((_artwork_id(row), row) for row in rows) if artwork_id is not None]
+        )
+
+    def _reindex_search_table(self, table_name):
+        """Rebuild the search entries of one per-artist table"""
+        self.cursor.execute(f'DELETE FROM "{SEARCH_TABLE}" WHERE table_name = ?;', (table_name,))
+        if not self._table_exists(table_name):
+            return
+        cursor = self.conn.cursor()
+        cursor.execute(f'SELECT * FROM "{table_name}";')
+        columns = [description[0] for description in cursor.description]
+        while True:
+            rows = [dict(zip(columns, values)) for values in cursor.fetchmany(BULK_BATCH_SIZE)]
+            if not rows:
+                break
+            self._index_search(table_name, rows)
+
+    def search(self, query, page=1, per_page=SEARCH_PAGE_SIZE, raw=False):
+        """Full-text search over title, caption, tags and user name, best matches first.
+        Returns (results, total) where results are (artwork id, table, title, user, caption snippet).
+        Every word must match; raw=True passes FTS5 query syntax (OR, NEAR, prefix*, column:) through."""
+        if not raw:
+            query = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+        if not query:
+            return [], 0
+        self._ensure_search_index()
+        try:
+            self.cursor.execute(f'SELECT COUNT(*) FROM "{SEARCH_TABLE}" WHERE "{SEARCH_TABLE}" MATCH ?;', (query,))
+            total = self.cursor.fetchone()[0]
+            self.cursor.execute(
+                f'SELECT rowid, table_name, title, user, snippet("{SEARCH_TABLE}", 1, \'[\', \']\', \'...\', 12) '
+                f'FROM "{SEARCH_TABLE}" WHERE "{SEARCH_TABLE}" MATCH ? '
+                f'ORDER BY bm25("{SEARCH_TABLE}", {", ".join(map(str, SEARCH_WEIGHTS))}) LIMIT ? OFFSET ?;',
+                (query, per_page, (max(1, page) - 1) * per_page)
+            )
+            return self.cursor.fetchall(), total
+        except sqlite3.OperationalError as e:
+            print(f"Invalid search query {query!r}: {e}")
+            return [], 0
+
+    def _reindex_table(self, table_name):
+        """Rebuild the index entries of one metadata table (after it was renamed, trimmed or dropped)"""
+        self.cursor.execute(f'DELETE FROM "{DOWNLOADED_TABLE}" WHERE table_name = ?;', (table_name,))
+        self.cursor.execute(f'PRAGMA table_info("{table_name}")')
+        columns = {row[1] for row in self.cursor.fetchall()}
+        if not columns:
+            if self._table_exists(SEARCH_TABLE):
+                self._reindex_search_table(table_name)  # Drops the search entries of the deleted table
+            return  # Table no longer exists
+        source = "id" if "id" in columns else "CAST(filename AS INTEGER)"
+        self.cursor.execute(
+            f'INSERT OR REPLACE INTO "{DOWNLOADED_TABLE}" (id, table_name) '
+            f'SELECT {source}, ? FROM "{table_name}" WHERE {source} > 0;',
+            (table_name,)
+        )
+        if self._table_exists(SEARCH_TABLE):
+            self._reindex_search_table(table_name)
+
+    def _metadata_tables(self):
+        """Names of the per-artist metadata tables"""
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
+        return [row[0] for row in self.cursor.fetchall()
+                if row[0] not in INTERNAL_TABLES and not row[0].startswith(f"{SEARCH_TABLE}_")]  # FTS5 shadow tables
+
+    def rename_table(self, old_name: str, new_name: str, verbose=True):
+        super().rename_table(old_name, new_name, verbose)
+        self._ensure_downloaded_index()
+        for table in (re.sub(r'\W', '_', old_name), re.sub(r'\W', '_', new_name)):
+            self._reindex_table(table)
+        self.conn.commit()
+
+    def delete_table(self, table_name: str):
+        super().delete_table(table_name)
+        self._ensure_downloaded_index()
+        self._reindex_table(table_name)
+        self.conn.commit()
+
+    def delete_row(self, row_name: str, table_name: str):
+        super().delete_row(row_name, table_name)
+        self._ensure_downloaded_index()
+        self._reindex_table(table_name)
+        self.conn.commit()
+
+    def open_pool(self, size=POOL_SIZE, **pragmas):
+        pool = super().open_pool(size, **pragmas)
+        with pool.connection() as conn:  # The main connection may be closed, as in the tkinter app
+            with self._using(conn):
+                self._ensure_downloaded_index()  # Lookups through the pool never have to create it
+        return pool
+
+    @contextmanager
+    def _using(self, conn):
+        """Temporarily run the single-connection helpers on another connection"""
+        main_conn, main_cursor = self.conn, self.cursor
+        self.conn, self.cursor = conn, conn.cursor()
+        try:
+            yield
+        finally:
+            self.conn, self.cursor = main_conn, main_cursor
+
+    def are_downloaded(self, ids):
+        """Return the set of the given artwork IDs that are already in the database"""
+        ids = json.dumps(sorted({int(id) for id in ids}))  # One bound JSON array, whatever the batch size
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                return {row[0] for row in conn.execute(DOWNLOADED_QUERY, (ids,))}
+        self._ensure_downloaded_index()
+        self.cursor.execute(DOWNLOADED_QUERY, (ids,))
+        return {row[0] for row in self.cursor.fetchall()}
+
     def is_url_downloaded(self, id):
             """Check if the URL has already been downloaded across all tables."""
             id = int(id)
             try:
-                # Get a list of all tables in the database
-                self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-                tables = self.cursor.fetchall()
-                
-                # Iterate through each table and check if the URL exists
-                for table in tables:
-                    table_name = table[0]
-                    table_name = self._sanitize_table_name(table_name)
-                    
-                    # Check if the filename exists in the table
-                    self.cursor.execute(f'''
-                        SELECT COUNT(*) FROM {table_name} WHERE filename = ?;
-                    ''', (id,))
-                    count = self.cursor.fetchone()[0]
-                    
-                    if count > 0:  # If the URL exists in any table, return True
-                        return True
-                return False  # Return False if the URL doesn't exist in any table
+                return id in self.are_downloaded([id])  # Single primary key lookup in the global index
             except sqlite3.Error as e:
                 print(f"Error checking URL across all tables: {e}")
                 return False
 
-    def pre_download_duplicated_check(self, base_dir):
-        # Get all table names dynamically
-        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in self.cursor.fetchall()]
+    def pre_download_duplicated_check(self, base_dir, dry_run=True, workers=SWEEP_WORKERS):
+        """Plan the removal of artwork files whose ID is already stored for another artist folder (e.g. a
+        re-download after the account was renamed) and whose copy in that folder is still on disk.
+        Returns the plan, a list of (duplicate path, table kept); files are only deleted with dry_run=False."""
+        # Each top-level folder is an artist folder named like its table; they are scanned in parallel
+        folders = []
+        files = []
+        with os.scandir(base_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append((entry.path, self._sanitize_table_name(entry.name)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for found in pool.map(lambda folder: _scan_artworks(*folder), folders):
+                files.extend(found)
 
-        # Initialize an empty set to store known filenames
-        known_files = set()
+        # Join the scanned IDs with the global index instead of loading every stored filename
+        self._ensure_downloaded_index()
+        self.cursor.execute("CREATE TEMP TABLE IF NOT EXISTS sweep_files (id INTEGER, table_name TEXT, path TEXT);")
+        self.cursor.execute("DELETE FROM sweep_files;")
+        self.cursor.executemany("INSERT INTO sweep_files VALUES (?, ?, ?);", files)
+        self.cursor.execute(
+            f'SELECT f.path, d.table_name FROM sweep_files f JOIN "{DOWNLOADED_TABLE}" d ON d.id = f.id '
+            f'WHERE d.table_name != f.table_name '
+            f'AND EXISTS (SELECT 1 FROM sweep_files g WHERE g.id = f.id AND g.table_name = d.table_name) '
+            f'ORDER BY f.path;'
+        )
+        plan = self.cursor.fetchall()
+        self.cursor.execute("DELETE FROM sweep_files;")
+        self.conn.commit()
+        print(f"Scanned {len(files)} artwork files in {len(folders)} folders, {len(plan)} duplicate(s) found.")
+        if dry_run:
+            for fpath, table_name in plan:
+                print(f"Would delete {fpath} (kept in {table_name})")
+            return plan
+        self.remove_duplicates(plan)
+        return plan
 
-        # Iterate over all tables and get filenames
-        for table in tables:
-            try:
-                self.cursor.execute(f"SELECT filename FROM {table}")
-                # Add filenames to the known_files set
-                known_files.update(row[0] for row in self.cursor.fetchall())
-            except Exception as e:
-                print(f"Error querying table {table}: {e}")
-
-        # Walk through all subdirectories to find and remove duplicates
+    def remove_duplicates(self, plan):
+        """Apply a plan of pre_download_duplicated_check: delete every duplicate path in it"""
         removed = 0
-        for dirpath, _, filenames in os.walk(base_dir):
-            for fname in filenames:
-                if fname in known_files:
-                    print("Found repeated file(s)!")
-                    fpath = os.path.join(dirpath, fname)
-                    try:
-                        os.remove(fpath)
-                        removed += 1
-                        print(f"Deleted: {fpath}")
-                    except Exception as e:
-                        print(f"Failed to delete {fpath}: {e}")
-                    print(f"\n✅ Done. Deleted {removed} duplicate files.")
-
+        failed = []
+        for start in range(0, len(plan), DELETE_BATCH_SIZE):
+            for fpath, _ in plan[start:start + DELETE_BATCH_SIZE]:
+                try:
+                    os.remove(fpath)
+                    removed += 1
+                except OSError as e:
+                    failed.append(f"{fpath}: {e}")
+            print(f"Deleted {removed}/{len(plan)} duplicate files...")
+        for failure in failed:
+            print(f"Failed to delete {failure}")
+        print(f"\n✅ Done. Deleted {removed} duplicate files.")
+        return removed
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["migrate"]:  # python database.py migrate [db name] [folder]
+        handler = JSONhandler(sys.argv[2] if len(sys.argv) > 2 else "pixiv.db", sys.argv[3] if len(sys.argv) > 3 else "./database")
+        handler.migrate_to_normalized()
+        handler.close_conn()
+        sys.exit(0)
     handler = JSONhandler("pixiv.db", rel_path="./database")
     handler.process_jsons(r"D:\1_P\Web_Scraper\Pixiv_Downloader")  # <- asegúrate de pasar la ruta correcta
     handler.consult_tables()
@@ -1,21 +1,59 @@
 import os
 import json
 import sys
+import time
+import uuid
+import threading
+import multiprocessing
+STARTED = time.perf_counter()  # Before the Qt import, for --profile-startup
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                 QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                                 QRadioButton, QMessageBox, QFileDialog, QButtonGroup,
-                                QComboBox, QFrame, QProgressBar, QDialog)
-from PySide6.QtCore import Qt, QThread, Signal, QEventLoop
-from core_logic import Downloader
+                                QComboBox, QFrame, QProgressBar, QDialog, QTableWidget,
+                                QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PySide6.QtCore import Qt, QThread, Signal, QEventLoop, QTimer
+from progress import format_bytes, format_progress
+from governor import DownloadGovernor
+
+# core_logic pulls in yt-dlp, mutagen and the extractors; it is imported in the background
+# when the first download is queued so the window does not wait for it
+_core_loader = None
+_core_loader_lock = threading.Lock()
+
+
+def _import_core():
+    """Import the download backend and load the YouTube extractor modules"""
+    import core_logic
+    import yt_dlp
+    yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}).get_info_extractor('Youtube')
+    return core_logic
+
+
+def preload_core():
+    """Start importing the download backend in a background thread (only once)"""
+    global _core_loader
+    with _core_loader_lock:
+        if _core_loader is None:
+            _core_loader = threading.Thread(target=_import_core, name="core-preload", daemon=True)
+            _core_loader.start()
+
+
+def load_core():
+    """Return the core_logic module, waiting for the background import if it is still running"""
+    preload_core()
+    _core_loader.join()
+    import core_logic  # Raises the import error again if the background import failed
+    return core_logic
 
 
 class DownloadThread(QThread):
     """Thread for handling downloads without freezing the UI"""
-    progress_update = Signal(str)
-    download_complete = Signal(bool, str)
+    progress_update = Signal(str, object)  # job id, progress snapshot dict
+    download_complete = Signal(str, bool, str)  # job id, success, message
     
-    def __init__(self, url, output_folder, download_type, normalize_audio, ask_download_list, download_playlist=True):
+    def __init__(self, url, output_folder, download_type, normalize_audio, ask_download_list, download_playlist=True, max_downloads=1, job_id="", governor=None, dedup_path=None):
         super().__init__()
+        self.job_id = job_id
         self.url = url
         self.output_folder = output_folder
         self.download_type = download_type
@@ -23,16 +61,28 @@ class DownloadThread(QThread):
         self.ask_download_list = ask_download_list
         self.is_playlist = "list=" in url
         self.download_playlist = download_playlist
+        self.max_downloads = max_downloads
+        self.governor = governor
+        self.dedup_path = dedup_path
     
     def run(self):
         try:
-            downloader = Downloader(self.url, self.output_folder)
+            core = load_core()
+            downloader = core.Downloader(self.url, self.output_folder)
             
-            # Set progress callback
-            def progress_callback(percent):
-                self.progress_update.emit(str(percent))
+            # Throttled numeric progress, so fast downloads cannot flood the UI thread
+            def progress_listener(snapshot):
+                self.progress_update.emit(self.job_id, snapshot)
             
-            downloader.set_progress_callback(progress_callback)
+            downloader.set_progress_listener(progress_listener)
+            downloader.set_single_pass(True)
+            downloader.set_max_workers(self.max_downloads)
+            downloader.set_normalize_audio(self.normalize_audio)
+            downloader.set_two_pass_normalization(True)
+            downloader.set_governor(self.governor)
+            downloader.set_info_cache()  # Tagging reuses the metadata of recent extractions
+            downloader.set_fused_audio(True)  # One ffmpeg run per track instead of one per step
+            downloader.set_dedup(self.dedup_path)
             
             # Configure options based on download type
             if self.download_type == "audio":
@@ -51,10 +101,15 @@ class DownloadThread(QThread):
             if self.download_type == "audio":
                 metadata_result = downloader.add_audio_metadata()
             
+            # Last step: files must not be modified once they may be hard links
+            if self.dedup_path and downloader.downloaded_files:
+                dedup_result = downloader.deduplicate()
+                metadata_result = f"{metadata_result}\n{dedup_result}" if metadata_result else dedup_result
+            
             complete_message = f"{result}\n{metadata_result}" if metadata_result else result
-            self.download_complete.emit(True, complete_message)
+            self.download_complete.emit(self.job_id, not result.startswith(core.ERROR_PREFIXES), complete_message)
         except Exception as e:
-            self.download_complete.emit(False, f"Download failed: {str(e)}")
+            self.download_complete.emit(self.job_id, False, f"Download failed: {str(e)}")
 
 
 class BaseWindow(QMainWindow):
@@ -68,11 +123,16 @@ class BaseWindow(QMainWindow):
         # Default settings
         self.ask_download_list = True
         self.normalize_audio = True
+        self.max_downloads = 3
+        self.max_jobs = 2
+        self.max_bandwidth = 0  # MB/s shared by all running jobs, 0 = unlimited
         
         # Default paths
         self.default_audio_folder = os.path.join(os.getcwd(), "downloads", "audio")
         self.default_video_folder = os.path.join(os.getcwd(), "downloads", "video")
         self.info_path = os.path.join(os.getcwd(), "config", "help.json")  # Fixed path
+        self.queue_path = os.path.join(os.getcwd(), "config", "queue.json")  # Persistent download queue
+        self.dedup_path = os.path.join(os.getcwd(), "config", "dedup.db")  # Shared by the audio and video folders
         
         # Create directories if they don't exist
         os.makedirs(self.default_audio_folder, exist_ok=True)
@@ -103,18 +163,31 @@ class BaseWindow(QMainWindow):
 class MainWindow(BaseWindow):
     """Main application window"""
     
-    def __init__(self, settings=None):
+    # Queue table columns
+    URL_COLUMN, TYPE_COLUMN, STATUS_COLUMN, PROGRESS_COLUMN = range(4)
+    
+    def __init__(self, settings=None, restore_queue=True):
         super().__init__()
+        self.restore_queue = restore_queue  # Off for --profile-startup: no saved jobs are loaded, run or overwritten
         
         # Apply settings if provided
         if settings:
             self.ask_download_list = settings.get('ask_download_list', True)
             self.normalize_audio = settings.get('normalize_audio', True)
+            self.max_downloads = settings.get('max_downloads', 3)
+            self.max_jobs = settings.get('max_jobs', 2)
+            self.max_bandwidth = settings.get('max_bandwidth', 0)
         
         self.output_folder = self.default_audio_folder  # Default to audio folder
-        self.download_thread = None  # Initialize download thread reference
+        self.jobs = []  # Download queue, saved to self.queue_path
+        self.download_threads = {}  # Job id -> running DownloadThread
+        self.job_speeds = {}  # Job id -> current download speed in bytes/s
+        self.governor = DownloadGovernor(self.max_bandwidth * 1024 * 1024)  # Shared by every job
         
         self.init_ui()
+        if self.restore_queue:
+            self.load_queue()
+            QTimer.singleShot(0, self.schedule_jobs)  # Resume the saved queue once the window is shown
     
     def init_ui(self):
         """Initialize the user interface"""
@@ -132,6 +205,7 @@ class MainWindow(BaseWindow):
         url_label.setStyleSheet("font-weight: bold;")
         self.url_input = QLineEdit()
         self.url_input.setPlaceholderText("Enter YouTube URL here...")
+        self.url_input.returnPressed.connect(self.start_download)
         
         # Folder selection section
         folder_label = QLabel("Output Folder:")
@@ -166,6 +240,17 @@ class MainWindow(BaseWindow):
         type_layout.addWidget(self.video_radio)
         type_layout.addStretch()
         
+        # Queue section
+        queue_label = QLabel("Download Queue:")
+        queue_label.setStyleSheet("font-weight: bold;")
+        
+        self.queue_table = QTableWidget(0, 4)
+        self.queue_table.setHorizontalHeaderLabels(["URL", "Type", "Status", "Progress"])
+        self.queue_table.horizontalHeader().setSectionResizeMode(self.URL_COLUMN, QHeaderView.Stretch)
+        self.queue_table.verticalHeader().setVisible(False)
+        self.queue_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        
         # Progress section
         progress_frame = QFrame()
         progress_frame.setFrameShape(QFrame.StyledPanel)
@@ -182,11 +267,14 @@ class MainWindow(BaseWindow):
         # Action buttons
         button_layout = QHBoxLayout()
         
-        self.download_button = QPushButton("Download")
+        self.download_button = QPushButton("Add to Queue")
         self.download_button.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold; padding: 8px 16px;")
         self.download_button.setMinimumHeight(40)
         self.download_button.clicked.connect(self.start_download)
         
+        self.clear_button = QPushButton("Clear Finished")
+        self.clear_button.clicked.connect(self.clear_finished)
+        
         self.settings_button = QPushButton("Settings")
         self.settings_button.clicked.connect(self.open_settings)
         
@@ -194,6 +282,7 @@ class MainWindow(BaseWindow):
         self.about_button.clicked.connect(self.show_version)
         
         button_layout.addWidget(self.download_button, 2)
+        button_layout.addWidget(self.clear_button, 1)
         button_layout.addWidget(self.settings_button, 1)
         button_layout.addWidget(self.about_button, 1)
         
@@ -204,8 +293,9 @@ class MainWindow(BaseWindow):
         main_layout.addLayout(folder_layout)
         main_layout.addWidget(type_label)
         main_layout.addLayout(type_layout)
+        main_layout.addWidget(queue_label)
+        main_layout.addWidget(self.queue_table, 1)
         main_layout.addWidget(progress_frame)
-        main_layout.addStretch()
         main_layout.addLayout(button_layout)
         
         # Set central widget
@@ -227,52 +317,46 @@ class MainWindow(BaseWindow):
             self.folder_input.setText(self.default_video_folder)
             self.output_folder = self.default_video_folder
     
-    def update_progress(self, progress_str):
-        """Update the progress bar and label"""
-        try:
-            # Handle different progress string formats
-            if isinstance(progress_str, str):
-                # Extract percentage from string like '87.5%' or just '87.5'
-                clean_progress = progress_str.replace('%', '').strip()
-                progress_val = float(clean_progress)
-            else:
-                progress_val = float(progress_str)
-            
-            # Clamp progress between 0 and 100
-            progress_val = max(0, min(100, progress_val))
-            
-            self.progress_bar.setValue(int(progress_val))
-            self.progress_label.setText(f"Downloading: {progress_val:.1f}%")
-        except (ValueError, AttributeError, TypeError):
-            # If the progress string can't be converted to a number,
-            # just show the message
-            self.progress_label.setText("Downloading...")
-    
-    def download_finished(self, success, message):
-        """Handle download completion"""
-        if success:
-            self.progress_bar.setValue(100)
-            self.progress_label.setText("Download complete!")
-            
-            # Show only the first few lines if message is very long
-            if isinstance(message, str) and len(message.splitlines()) > 10:
-                short_message = "\n".join(message.splitlines()[:10])
-                short_message += f"\n\n... and {len(message.splitlines()) - 10} more items"
-                self.show_message("Success", short_message)
-            else:
-                self.show_message("Success", str(message))
-        else:
-            self.progress_label.setText("Download failed!")
-            self.show_message("Error", str(message), QMessageBox.Critical)
+    def update_progress(self, job_id, snapshot):
+        """Update the progress bar of a job row from a progress snapshot"""
+        row = self.find_job_row(job_id)
+        if row is None:
+            return
+        progress_bar = self.queue_table.cellWidget(row, self.PROGRESS_COLUMN)
+        progress_bar.setValue(int(snapshot['percent']))
+        progress_bar.setFormat(format_progress(snapshot))
+        self.job_speeds[job_id] = snapshot['speed']
+        self.refresh_overall_progress()
+    
+    def download_finished(self, job_id, success, message):
+        """Handle the completion of a queued job"""
+        job = self.find_job(job_id)
+        thread = self.download_threads.pop(job_id, None)
+        self.job_speeds.pop(job_id, None)
+        if thread:
+            thread.deleteLater()
+        if job is None:
+            return
         
-        # Re-enable the download button and clean up thread
-        self.download_button.setEnabled(True)
-        if self.download_thread:
-            self.download_thread.deleteLater()
-            self.download_thread = None
+        job['status'] = "done" if success else "failed"
+        job['message'] = str(message)
+        self.refresh_job_row(job)
+        self.save_queue()
+        self.schedule_jobs()
+        
+        # Summarize once the whole queue has drained instead of one popup per job
+        if not self.download_threads:
+            finished = [j for j in self.jobs if j['status'] in ("done", "failed")]
+            failed = [j for j in finished if j['status'] == "failed"]
+            if failed:
+                details = "\n".join(f"{j['url']}: {j['message'].splitlines()[0]}" for j in failed[:10])
+                self.show_message("Queue finished", f"{len(finished) - len(failed)} job(s) completed, "
+                                  f"{len(failed)} failed:\n\n{details}", QMessageBox.Warning)
+            else:
+                self.show_message("Success", f"Queue finished! {len(finished)} job(s) completed.")
     
     def start_download(self):
-        """Start the download process"""
+        """Validate the inputs and add a job to the download queue"""
         url = self.url_input.text().strip()
         output_folder = self.folder_input.text().strip()
         
@@ -306,59 +390,183 @@ class MainWindow(BaseWindow):
             )
             download_playlist = (reply == QMessageBox.Yes)
         
-        # Determine download type
-        download_type = "audio" if self.audio_radio.isChecked() else "video"
-        
-        # Disable download button during download
-        self.download_button.setEnabled(False)
-        self.progress_bar.setValue(0)
-        self.progress_label.setText("Starting download...")
-        
-        # Clean up previous thread if it exists
-        if self.download_thread:
-            self.download_thread.quit()
-            self.download_thread.wait()
-            self.download_thread.deleteLater()
-        
-        # Create and start download thread
-        self.download_thread = DownloadThread(
-            url, 
-            output_folder, 
-            download_type, 
+        job = {
+            'id': uuid.uuid4().hex,
+            'url': url,
+            'output_folder': output_folder,
+            'download_type': "audio" if self.audio_radio.isChecked() else "video",
+            'download_playlist': download_playlist,
+            'status': "queued",
+            'message': "",
+        }
+        self.jobs.append(job)
+        preload_core()  # Starts loading yt-dlp while the job waits for a free slot
+        self.add_job_row(job)
+        self.url_input.clear()
+        self.save_queue()
+        self.schedule_jobs()
+    
+    def schedule_jobs(self):
+        """Start queued jobs until the concurrency limit is reached"""
+        for job in self.jobs:
+            if len(self.download_threads) >= self.max_jobs:
+                break
+            if job['status'] == "queued":
+                self.start_job(job)
+        self.refresh_overall_progress()
+    
+    def start_job(self, job):
+        """Start a DownloadThread for a queued job"""
+        preload_core()
+        thread = DownloadThread(
+            job['url'], 
+            job['output_folder'], 
+            job['download_type'], 
             self.normalize_audio, 
             self.ask_download_list,
-            download_playlist
+            job['download_playlist'],
+            self.max_downloads,
+            job['id'],
+            self.governor,
+            self.dedup_path
         )
-        self.download_thread.progress_update.connect(self.update_progress)
-        self.download_thread.download_complete.connect(self.download_finished)
-        self.download_thread.start()
+        thread.progress_update.connect(self.update_progress)
+        thread.download_complete.connect(self.download_finished)
+        self.download_threads[job['id']] = thread
+        job['status'] = "running"
+        self.refresh_job_row(job)
+        self.save_queue()
+        thread.start()
+    
+    def find_job(self, job_id):
+        """Return the queued job with the given id"""
+        return next((job for job in self.jobs if job['id'] == job_id), None)
+    
+    def find_job_row(self, job_id):
+        """Return the table row showing the given job"""
+        for row in range(self.queue_table.rowCount()):
+            if self.queue_table.item(row, self.URL_COLUMN).data(Qt.UserRole) == job_id:
+                return row
+        return None
+    
+    def add_job_row(self, job):
+        """Append a row for a job to the queue table"""
+        row = self.queue_table.rowCount()
+        self.queue_table.insertRow(row)
+        url_item = QTableWidgetItem(job['url'])
+        url_item.setData(Qt.UserRole, job['id'])
+        self.queue_table.setItem(row, self.URL_COLUMN, url_item)
+        self.queue_table.setItem(row, self.TYPE_COLUMN, QTableWidgetItem(job['download_type']))
+        self.queue_table.setItem(row, self.STATUS_COLUMN, QTableWidgetItem(job['status']))
+        progress_bar = QProgressBar()
+        progress_bar.setRange(0, 100)
+        self.queue_table.setCellWidget(row, self.PROGRESS_COLUMN, progress_bar)
+        self.refresh_job_row(job)
+    
+    def refresh_job_row(self, job):
+        """Show the current status of a job in its row"""
+        row = self.find_job_row(job['id'])
+        if row is None:
+            return
+        status_item = self.queue_table.item(row, self.STATUS_COLUMN)
+        status_item.setText(job['status'])
+        status_item.setToolTip(job['message'])
+        progress_bar = self.queue_table.cellWidget(row, self.PROGRESS_COLUMN)
+        if job['status'] in ("done", "failed"):
+            progress_bar.setValue(100 if job['status'] == "done" else 0)
+            progress_bar.setFormat("Complete" if job['status'] == "done" else "Failed")
+        elif job['status'] == "queued":
+            progress_bar.setValue(0)
+            progress_bar.setFormat("Waiting")
+        self.refresh_overall_progress()
+    
+    def refresh_overall_progress(self):
+        """Show how much of the queue has been processed"""
+        total = len(self.jobs)
+        finished = sum(1 for job in self.jobs if job['status'] in ("done", "failed"))
+        queued = sum(1 for job in self.jobs if job['status'] == "queued")
+        self.progress_bar.setValue(int(finished / total * 100) if total else 0)
+        if not total:
+            self.progress_label.setText("Ready")
+        else:
+            speed = sum(self.job_speeds.values())
+            self.progress_label.setText(f"Running: {len(self.download_threads)}, queued: {queued}, "
+                                        f"finished: {finished}/{total}"
+                                        + (f" - {format_bytes(speed)}/s" if speed else ""))
+    
+    def clear_finished(self):
+        """Remove finished and failed jobs from the queue"""
+        self.jobs = [job for job in self.jobs if job['status'] not in ("done", "failed")]
+        self.queue_table.setRowCount(0)
+        for job in self.jobs:
+            self.add_job_row(job)
+        self.save_queue()
+    
+    def save_queue(self):
+        """Persist the queue so unfinished jobs survive an app restart"""
+        if not self.restore_queue:
+            return
+        try:
+            with open(self.queue_path, "w", encoding="utf-8") as queue_file:
+                json.dump(self.jobs, queue_file, indent=2)
+        except OSError as e:
+            print(f"Could not save the download queue: {e}")
+    
+    def load_queue(self):
+        """Restore the queue saved by a previous session"""
+        try:
+            with open(self.queue_path, "r", encoding="utf-8") as queue_file:
+                self.jobs = json.load(queue_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.jobs = []
+        for job in self.jobs:
+            if job['status'] == "running":  # Interrupted by the last shutdown
+                job['status'] = "queued"
+            self.add_job_row(job)
     
     def open_settings(self):
         """Open the settings window"""
-        settings_dialog = SettingsWindow(self.ask_download_list, self.normalize_audio)
+        settings_dialog = SettingsWindow(self.ask_download_list, self.normalize_audio, self.max_downloads, self.max_jobs,
+                                         self.max_bandwidth)
         if settings_dialog.exec():
             # Update settings if dialog was accepted
             self.ask_download_list = settings_dialog.ask_download_list
             self.normalize_audio = settings_dialog.normalize_audio
+            self.max_downloads = settings_dialog.max_downloads
+            self.max_jobs = settings_dialog.max_jobs
+            self.max_bandwidth = settings_dialog.max_bandwidth
+            self.governor.set_max_bandwidth(self.max_bandwidth * 1024 * 1024)
+            self.schedule_jobs()
     
     def closeEvent(self, event):
         """Handle application close event"""
-        # Stop download thread if running
-        if self.download_thread and self.download_thread.isRunning():
-            self.download_thread.quit()
-            self.download_thread.wait(3000)  # Wait up to 3 seconds
+        # Stop running download threads; their jobs are queued again on the next start
+        for job_id, thread in self.download_threads.items():
+            if thread.isRunning():
+                thread.quit()
+                thread.wait(3000)  # Wait up to 3 seconds
+            job = self.find_job(job_id)
+            if job:
+                job['status'] = "queued"
+        self.save_queue()
         event.accept()
 
 
 class SettingsWindow(QDialog):  # Changed from QMainWindow to QDialog
     """Settings window dialog"""
     
-    def __init__(self, ask_download_list, normalize_audio, parent=None):
+    # Bandwidth limit choices in MB/s, 0 = unlimited
+    BANDWIDTH_CHOICES = [0, 1, 2, 5, 10, 20, 50]
+    
+    def __init__(self, ask_download_list, normalize_audio, max_downloads=3, max_jobs=2, max_bandwidth=0, parent=None):
         super().__init__(parent)
         
         # Store current settings
         self.ask_download_list = ask_download_list
         self.normalize_audio = normalize_audio
+        self.max_downloads = max_downloads
+        self.max_jobs = max_jobs
+        self.max_bandwidth = max_bandwidth
         
         # Set window properties
         self.setWindowTitle("Settings")
@@ -390,6 +598,30 @@ class SettingsWindow(QDialog):  # Changed from QMainWindow to QDialog
         self.normalize_combo.addItems(["True", "False"])
         self.normalize_combo.setCurrentText(str(self.normalize_audio))
         
+        # Simultaneous downloads setting
+        workers_label = QLabel("Simultaneous downloads:")
+        workers_label.setStyleSheet("font-weight: bold;")
+        
+        self.workers_combo = QComboBox()
+        self.workers_combo.addItems([str(n) for n in range(1, 9)])
+        self.workers_combo.setCurrentText(str(self.max_downloads))
+        
+        # Simultaneous jobs setting
+        jobs_label = QLabel("Simultaneous queue jobs:")
+        jobs_label.setStyleSheet("font-weight: bold;")
+        
+        self.jobs_combo = QComboBox()
+        self.jobs_combo.addItems([str(n) for n in range(1, 9)])
+        self.jobs_combo.setCurrentText(str(self.max_jobs))
+        
+        # Bandwidth limit setting
+        bandwidth_label = QLabel("Bandwidth limit:")
+        bandwidth_label.setStyleSheet("font-weight: bold;")
+        
+        self.bandwidth_combo = QComboBox()
+        self.bandwidth_combo.addItems([self.bandwidth_text(mb) for mb in self.BANDWIDTH_CHOICES])
+        self.bandwidth_combo.setCurrentText(self.bandwidth_text(self.max_bandwidth))
+        
         # Add explanation labels
         playlist_explanation = QLabel("When enabled, asks for confirmation before downloading playlists")
         playlist_explanation.setStyleSheet("color: gray; font-style: italic;")
@@ -397,6 +629,15 @@ class SettingsWindow(QDialog):  # Changed from QMainWindow to QDialog
         normalize_explanation = QLabel("Normalizes audio volume levels (recommended)")
         normalize_explanation.setStyleSheet("color: gray; font-style: italic;")
         
+        workers_explanation = QLabel("Number of playlist entries downloaded at the same time")
+        workers_explanation.setStyleSheet("color: gray; font-style: italic;")
+        
+        jobs_explanation = QLabel("Number of queued URLs processed at the same time")
+        jobs_explanation.setStyleSheet("color: gray; font-style: italic;")
+        
+        bandwidth_explanation = QLabel("Shared by all running downloads; slows down automatically when YouTube throttles")
+        bandwidth_explanation.setStyleSheet("color: gray; font-style: italic;")
+        
         # Buttons
         button_layout = QHBoxLayout()
         
@@ -417,6 +658,18 @@ class SettingsWindow(QDialog):  # Changed from QMainWindow to QDialog
         main_layout.addWidget(normalize_label)
         main_layout.addWidget(self.normalize_combo)
         main_layout.addWidget(normalize_explanation)
+        main_layout.addSpacing(10)
+        main_layout.addWidget(workers_label)
+        main_layout.addWidget(self.workers_combo)
+        main_layout.addWidget(workers_explanation)
+        main_layout.addSpacing(10)
+        main_layout.addWidget(jobs_label)
+        main_layout.addWidget(self.jobs_combo)
+        main_layout.addWidget(jobs_explanation)
+        main_layout.addSpacing(10)
+        main_layout.addWidget(bandwidth_label)
+        main_layout.addWidget(self.bandwidth_combo)
+        main_layout.addWidget(bandwidth_explanation)
         main_layout.addStretch()
         main_layout.addLayout(button_layout)
     
@@ -424,6 +677,9 @@ class SettingsWindow(QDialog):  # Changed from QMainWindow to QDialog
         """Save settings and close dialog"""
         self.ask_download_list = self.playlist_combo.currentText() == "True"
         self.normalize_audio = self.normalize_combo.currentText() == "True"
+        self.max_downloads = int(self.workers_combo.currentText())
+        self.max_jobs = int(self.jobs_combo.currentText())
+        self.max_bandwidth = self.BANDWIDTH_CHOICES[self.bandwidth_combo.currentIndex()]
         
         # Show confirmation message
         QMessageBox.information(
@@ -431,19 +687,40 @@ class SettingsWindow(QDialog):  # Changed from QMainWindow to QDialog
             "Settings Saved",
             f"Settings updated:\n"
             f"- Ask for playlist confirmation: {self.ask_download_list}\n"
-            f"- Normalize audio: {self.normalize_audio}"
+            f"- Normalize audio: {self.normalize_audio}\n"
+            f"- Simultaneous downloads: {self.max_downloads}\n"
+            f"- Simultaneous queue jobs: {self.max_jobs}\n"
+            f"- Bandwidth limit: {self.bandwidth_text(self.max_bandwidth)}"
         )
         
         self.accept()
+    
+    @staticmethod
+    def bandwidth_text(mb_per_second):
+        """Label of a bandwidth limit choice"""
+        return f"{mb_per_second} MB/s" if mb_per_second else "Unlimited"
+
+
+def report_startup():
+    """Print the time to first window and exit (used by the import-time profile in build.py)"""
+    print(f"STARTUP first_window_ms={(time.perf_counter() - STARTED) * 1000:.1f} "
+          f"core_loaded={'core_logic' in sys.modules}", flush=True)
+    QApplication.instance().quit()
 
 
 if __name__ == "__main__":
+    # Required for the normalization process pool in frozen (Nuitka) builds
+    multiprocessing.freeze_support()
+    if "--eager-imports" in sys.argv:
+        _import_core()  # Previous behaviour: load everything before the window, for comparison
     app = QApplication(sys.argv)
     
     # Apply some basic styling
     app.setStyle("Fusion")
     
-    window = MainWindow()
+    window = MainWindow(restore_queue="--profile-startup" not in sys.argv)
     window.show()
+    if "--profile-startup" in sys.argv:
+        QTimer.singleShot(0, report_startup)
     
     sys.exit(app.exec())
\ No newline at end of file
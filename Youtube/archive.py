@@ -0,0 +1,72 @@
+import os
+import time
+import sqlite3
+import threading
+
+ARCHIVE_NAME = '.download_archive.db'
+LOOKUP_CHUNK = 500  # Stay below SQLite's bound parameter limit
+
+
+class DownloadArchive:
+    """Persistent index of downloaded videos keyed by video ID and download kind (audio/video)"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.db_path = os.path.join(folder, ARCHIVE_NAME)
+        self.lock = threading.Lock()  # Download workers record from several threads
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS downloads ('
+            'video_id TEXT NOT NULL, kind TEXT NOT NULL, filename TEXT NOT NULL, size INTEGER, '
+            'format TEXT, downloaded_at REAL, PRIMARY KEY (video_id, kind));'
+        )
+        self.conn.commit()
+
+    def lookup(self, video_ids, kind):
+        """Return {video_id: record} for the given IDs with one query per chunk"""
+        video_ids = [video_id for video_id in dict.fromkeys(video_ids) if video_id]
+        records = {}
+        with self.lock:
+            for start in range(0, len(video_ids), LOOKUP_CHUNK):
+                chunk = video_ids[start:start + LOOKUP_CHUNK]
+                rows = self.conn.execute(
+                    f"SELECT video_id, filename, size, format FROM downloads "
+                    f"WHERE kind = ? AND video_id IN ({', '.join('?' for _ in chunk)});",
+                    (kind, *chunk)
+                ).fetchall()
+                for video_id, filename, size, fmt in rows:
+                    records[video_id] = {
+                        'path': os.path.join(self.folder, filename),
+                        'size': size,
+                        'format': fmt,
+                    }
+        return records
+
+    def record(self, video_id, kind, path, fmt=None):
+        """Store (or refresh) the final file of a downloaded video"""
+        self.record_many([(video_id, kind, path, fmt)])
+
+    def record_many(self, downloads):
+        """Store several (video_id, kind, path, format) tuples in one transaction"""
+        rows = []
+        for video_id, kind, path, fmt in downloads:
+            if not video_id:
+                continue
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            rows.append((video_id, kind, os.path.relpath(path, self.folder), size, fmt, time.time()))
+        if not rows:
+            return
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO downloads (video_id, kind, filename, size, format, downloaded_at) '
+                'VALUES (?, ?, ?, ?, ?, ?);',
+                rows
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,174 @@
+"""Headless batch runner for the YouTube Downloader.
+
+Usage: python batch.py jobs.json [--jobs 2] [--report results.json] [--limit-rate 5M] [--fragments 4] [--dry-run]
+
+The job file is a JSON object with an optional "defaults" section and a "jobs" list:
+
+    {
+        "defaults": {"mode": "audio", "output_folder": "downloads/audio", "normalize": true},
+        "jobs": [
+            {"url": "https://www.youtube.com/playlist?list=..."},
+            {"url": "https://www.youtube.com/watch?v=...", "mode": "video", "output_folder": "downloads/video"}
+        ]
+    }
+
+Job keys: url, mode ("audio"/"video"), output_folder, playlist, normalize, workers,
+incremental (known videos in a row before stopping, 0 = off), cache_ttl (seconds an extraction
+is reused, 0 = off), fused (transcode, normalize and tag audio in one ffmpeg run), dedup
+("hardlink", "skip" or "report" duplicates found in dedup_index, null = off) and options
+(extra yt-dlp options).
+--limit-rate caps the bandwidth of all jobs together, not of each job.
+--dry-run only reports what every job would download, using cached extractions where possible.
+A job where some entries failed is reported as "partial"; any job that did not fully succeed
+makes the exit code 1.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from yt_dlp.utils import parse_bytes
+from core_logic import Downloader, ERROR_PREFIXES
+from governor import DownloadGovernor, FRAGMENT_WORKERS
+from info_cache import DEFAULT_TTL
+
+DEFAULT_JOB = {
+    'mode': 'audio',
+    'output_folder': os.path.join(os.getcwd(), "downloads", "audio"),
+    'playlist': True,
+    'normalize': True,
+    'workers': 3,
+    'incremental': 0,
+    'cache_ttl': DEFAULT_TTL,
+    'fused': True,
+    'dedup': None,
+    'dedup_index': os.path.join(os.getcwd(), "config", "dedup.db"),
+    'options': {},
+}
+
+
+def load_jobs(job_file):
+    """Read a job file and merge every job with the defaults"""
+    with open(job_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):  # A bare list of jobs is accepted too
+        data = {'jobs': data}
+
+    defaults = dict(DEFAULT_JOB, **data.get('defaults', {}))
+    jobs = []
+    for job in data.get('jobs', []):
+        if isinstance(job, str):
+            job = {'url': job}
+        job = dict(defaults, **job)
+        if not job.get('url'):
+            raise ValueError(f"Job without url in {job_file}: {job}")
+        if job['mode'] not in ('audio', 'video'):
+            raise ValueError(f"Unsupported mode '{job['mode']}' for {job['url']}")
+        jobs.append(job)
+    return jobs
+
+
+def run_job(job, governor=None, dry_run=False):
+    """Run one job through Downloader (or preview it) and return its report entry"""
+    start = time.time()
+    report = {'url': job['url'], 'mode': job['mode'], 'output_folder': job['output_folder']}
+    try:
+        os.makedirs(job['output_folder'], exist_ok=True)
+        downloader = Downloader(job['url'], job['output_folder'])
+        if job['mode'] == "audio":
+            downloader.get_audio_opts()
+        else:
+            downloader.get_video_opts()
+
+        if "list=" in job['url'] and not job['playlist']:
+            downloader.add_option("--no-playlist")
+        for key, value in job['options'].items():
+            downloader.add_option(key, value)
+
+        downloader.set_single_pass(True)
+        downloader.set_max_workers(job['workers'])
+        downloader.set_incremental_sync(job['incremental'])
+        downloader.set_normalize_audio(job['normalize'])
+        downloader.set_two_pass_normalization(True)
+        downloader.set_governor(governor)
+        downloader.set_info_cache(job['cache_ttl'])
+        downloader.set_fused_audio(job['fused'])
+        if job['dedup']:
+            downloader.set_dedup(job['dedup_index'], job['dedup'])
+
+        if dry_run:
+            message = downloader.preview()
+            report.update({
+                'success': not message.startswith(ERROR_PREFIXES),
+                'message': message,
+                'planned_files': downloader.planned_files,
+            })
+        else:
+            message = downloader.download_video()
+            metadata_message = downloader.add_audio_metadata() if job['mode'] == "audio" else ""
+            dedup_message = downloader.deduplicate() if job['dedup'] else ""
+
+            if message.startswith(ERROR_PREFIXES):
+                status = 'failed'
+            elif downloader.failed_files:
+                status = 'partial'  # Some entries downloaded, others failed
+            else:
+                status = 'succeeded'
+            report.update({
+                'success': status == 'succeeded',
+                'status': status,
+                'failed_files': downloader.failed_files,
+                'message': message,
+                'metadata': metadata_message,
+                'dedup': dedup_message,
+                'downloaded_files': downloader.downloaded_files,
+                'normalization': downloader.normalization_results,
+            })
+    except Exception as e:
+        report.update({'success': False, 'message': f"Unexpected error: {str(e)}"})
+    report['seconds'] = round(time.time() - start, 3)
+    return report
+
+
+def run_jobs(jobs, max_jobs=2, governor=None, dry_run=False):
+    """Run jobs with at most max_jobs downloading at the same time, keeping the job order in the report"""
+    with ThreadPoolExecutor(max_workers=max(1, max_jobs)) as pool:
+        return list(pool.map(lambda job: run_job(job, governor, dry_run), jobs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run YouTube Downloader jobs without a display")
+    parser.add_argument("job_file", help="JSON file describing the jobs")
+    parser.add_argument("--jobs", type=int, default=2, help="Jobs running at the same time (default: 2)")
+    parser.add_argument("--report", default="results.json", help="Where to write the JSON results report")
+    parser.add_argument("--limit-rate", default=None, help="Bandwidth cap shared by all jobs, e.g. 500K or 5M")
+    parser.add_argument("--fragments", type=int, default=FRAGMENT_WORKERS,
+                        help=f"Concurrent fragment downloads per stream (default: {FRAGMENT_WORKERS})")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what each job would download")
+    args = parser.parse_args(argv)
+
+    max_bandwidth = 0
+    if args.limit_rate:
+        max_bandwidth = parse_bytes(args.limit_rate)
+        if max_bandwidth is None:
+            parser.error(f"Invalid --limit-rate: {args.limit_rate}")
+    governor = DownloadGovernor(max_bandwidth, args.fragments)
+
+    jobs = load_jobs(args.job_file)
+    print(f"Running {len(jobs)} job(s), {args.jobs} at a time...")
+    results = run_jobs(jobs, args.jobs, governor, args.dry_run)
+
+    succeeded = sum(1 for result in results if result['success'])
+    partial = sum(1 for result in results if result.get('status') == 'partial')
+    failed = len(results) - succeeded - partial
+    summary = {'jobs': len(results), 'succeeded': succeeded, 'partial': partial, 'failed': failed, 'results': results}
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"Finished: {succeeded} succeeded, {partial} partially failed, {failed} failed. "
+          f"Report written to {args.report}")
+    return 0 if succeeded == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,383 @@
+"""Benchmarks for the YouTube Downloader that never touch YouTube.
+
+python benchmark.py [sizes...]
+    Extractor calls of the two-pass, single-pass and incremental download modes (stub extractor).
+
+python benchmark.py --suite [sizes...] [--media-size 262144] [--latency 0.02] [--workers 3] [--json results.json]
+    Throughput, time to first byte and peak RSS of download_video, add_audio_metadata and
+    normalize_audio. Media is served by a local HTTP server and downloaded by yt-dlp itself;
+    every measurement runs in a fresh process so peak RSS is its own.
+"""
+import os
+import sys
+import json
+import time
+import types
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import yt_dlp
+import core_logic
+from core_logic import Downloader
+
+PLAYLIST_SIZES = [10, 100, 500]
+EXISTING_RATIO = 0.5  # Fraction of the playlist (the oldest entries) already present in the output folder
+PAGE_SIZE = 100  # Entries per playlist page request
+SUITE_SIZES = [10, 50, 200]
+MEDIA_SIZE = 256 * 1024  # Bytes per synthetic media file
+LATENCY = 0.02  # Seconds per extractor request and before the first byte of every media response
+CHUNK_SIZE = 64 * 1024
+
+
+class FakeYoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL that counts extractor calls instead of hitting the network"""
+    calls = 0
+
+    def __init__(self, params=None):
+        self.params = params or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def _resolve(self, index):
+        """Full metadata extraction of one video (one network round trip in yt-dlp)"""
+        FakeYoutubeDL.calls += 1
+        return {'id': f"vid{index}", 'title': f"Track {index}", 'ext': 'mp4', 'uploader': 'Benchmark'}
+
+    def _download(self, entry):
+        outtmpl = self.params.get('outtmpl', '%(title)s.%(ext)s')
+        path = outtmpl % {'title': entry['title'], 'ext': entry['ext']}
+        if not os.path.exists(path):  # yt-dlp does not overwrite finished files
+            with open(path, 'wb') as f:
+                f.write(b'\0' * 2048)
+        entry['requested_downloads'] = [{'filepath': path}]
+
+    def _lazy_entries(self, size):
+        """Flat entries fetched one playlist page at a time, newest first"""
+        for i in range(size):
+            if i % PAGE_SIZE == 0:
+                FakeYoutubeDL.calls += 1  # Playlist page
+            yield {'_type': 'url', 'id': f"vid{i}", 'title': f"Track {i}", 'url': f"fake://video/{i}"}
+
+    def extract_info(self, url, download=True, process=True, **kwargs):
+        size = int(url.rsplit('/', 1)[-1])
+        if not process:
+            return {'_type': 'playlist', 'id': f"list{size}", 'title': f"Playlist {size}",
+                    'entries': self._lazy_entries(size)}
+        FakeYoutubeDL.calls += -(-size // PAGE_SIZE)  # Every playlist page
+        flat = self.params.get('extract_flat') == 'in_playlist'
+        entries = []
+        for i in range(size):
+            if flat:
+                entries.append({'_type': 'url', 'id': f"vid{i}", 'title': f"Track {i}", 'url': f"fake://video/{i}"})
+            else:
+                entry = self._resolve(i)
+                if download:
+                    self._download(entry)
+                entries.append(entry)
+        return {'_type': 'playlist', 'id': f"list{size}", 'title': f"Playlist {size}", 'entries': entries}
+
+    def process_ie_result(self, ie_result, download=True, extra_info=None):
+        if ie_result.get('_type') == 'url':
+            ie_result = self._resolve(int(ie_result['url'].rsplit('/', 1)[-1]))
+        ie_result.update(extra_info or {})
+        if download:
+            self._download(ie_result)
+        return ie_result
+
+
+def prepare_folder(folder, size):
+    """Pre-create the share of the playlist that counts as already downloaded"""
+    for i in range(size - int(size * EXISTING_RATIO), size):
+        with open(os.path.join(folder, f"Track {i}.mp4"), 'wb') as f:
+            f.write(b'\0' * 2048)
+
+
+def run(size, single_pass, incremental=0):
+    """Run one download and return (extractor calls, seconds, result message)"""
+    with tempfile.TemporaryDirectory() as folder:
+        prepare_folder(folder, size)
+        downloader = Downloader(f"fake://playlist/{size}", folder)
+        downloader.get_video_opts()
+        downloader.set_single_pass(single_pass)
+        downloader.set_incremental_sync(incremental)
+        FakeYoutubeDL.calls = 0
+        start = time.perf_counter()
+        result = downloader.download_video()
+        return FakeYoutubeDL.calls, time.perf_counter() - start, result
+
+
+def main(sizes):
+    """Compare extractor calls of the download modes"""
+    core_logic.yt_dlp = types.SimpleNamespace(YoutubeDL=FakeYoutubeDL)
+    rows = []
+    for size in sizes:
+        legacy_calls, legacy_time, _ = run(size, False)
+        single_calls, single_time, _ = run(size, True)
+        incremental_calls, incremental_time, result = run(size, True, incremental=5)
+        rows.append((size, legacy_calls, single_calls, incremental_calls, legacy_time, single_time, incremental_time))
+    print(f"{'entries':>8} {'two-pass calls':>15} {'single-pass calls':>18} {'incremental calls':>18} "
+          f"{'two-pass s':>11} {'single-pass s':>14} {'incremental s':>14}")
+    for size, legacy_calls, single_calls, incremental_calls, legacy_time, single_time, incremental_time in rows:
+        print(f"{size:>8} {legacy_calls:>15} {single_calls:>18} {incremental_calls:>18} "
+              f"{legacy_time:>11.4f} {single_time:>14.4f} {incremental_time:>14.4f}")
+    print(f"Last result: {result}")
+
+
+class MediaHandler(BaseHTTPRequestHandler):
+    """Serves synthetic media: GET /media/<name>?size=<bytes>&latency=<seconds>"""
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        size = int(query.get('size', [MEDIA_SIZE])[0])
+        time.sleep(float(query.get('latency', [0])[0]))  # Server think time before the first byte
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+        chunk = b'\0' * CHUNK_SIZE
+        sent = 0
+        try:
+            while sent < size:
+                self.wfile.write(chunk[:size - sent])
+                sent += min(CHUNK_SIZE, size - sent)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_media_server():
+    """Start the media server on a free local port and return (server, base url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MediaHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class LocalYoutubeDL(yt_dlp.YoutubeDL):
+    """Real YoutubeDL whose extraction is answered locally, so format selection, downloading
+    and progress hooks all run through yt-dlp against the local media server"""
+    media_url = None
+    media_size = MEDIA_SIZE
+    latency = LATENCY
+    calls = 0
+
+    def extract_info(self, url, download=True, ie_key=None, extra_info=None, process=True,
+                     force_generic_extractor=False):
+        LocalYoutubeDL.calls += 1
+        time.sleep(self.latency)  # One extractor round trip
+        kind, index = url.rsplit('/', 2)[-2:]
+        base = {'extractor': 'bench', 'extractor_key': 'Bench', 'webpage_url': url}
+        if kind == 'playlist':
+            result = dict(base, _type='playlist', id=f"list{index}", title=f"Playlist {index}", uploader='Benchmark',
+                          entries=[{'_type': 'url', 'url': f"bench://video/{i}", 'id': f"vid{i}", 'title': f"Track {i}"}
+                                   for i in range(int(index))])
+        else:
+            media = f"{self.media_url}/media/{index}.mp4?size={self.media_size}&latency={self.latency}"
+            result = dict(base, id=f"vid{index}", title=f"Track {index}", uploader='Benchmark', upload_date='20240101',
+                          formats=[{'format_id': '18', 'url': media, 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'mp4a',
+                                    'filesize': self.media_size}])
+        if not process:
+            return result
+        return self.process_ie_result(result, download, extra_info or {})
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where it cannot be read"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KiB
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset  # Windows
+        except (ImportError, AttributeError):
+            return None
+
+
+def _measurement(name, size, seconds, files, total_bytes=None, **extra):
+    result = {
+        'benchmark': name,
+        'entries': size,
+        'files': files,
+        'seconds': round(seconds, 4),
+        'files_per_second': round(files / seconds, 2) if seconds else None,
+    }
+    if total_bytes is not None:
+        result['bytes'] = total_bytes
+        result['throughput_mib_s'] = round(total_bytes / seconds / (1024 * 1024), 2) if seconds else None
+    result.update(extra)
+    rss = peak_rss()
+    result['peak_rss_mib'] = round(rss / (1024 * 1024), 1) if rss else None
+    return result
+
+
+def bench_download(size, config):
+    """download_video of a playlist of `size` entries, none of them present yet"""
+    LocalYoutubeDL.media_url = config['media_url']
+    LocalYoutubeDL.media_size = config['media_size']
+    LocalYoutubeDL.latency = config['latency']
+    core_logic.yt_dlp = types.SimpleNamespace(YoutubeDL=LocalYoutubeDL)
+
+    with tempfile.TemporaryDirectory() as folder:
+        downloader = Downloader(f"bench://playlist/{size}", folder)
+        downloader.get_video_opts()
+        downloader.add_option('quiet')
+        downloader.add_option('noprogress')
+        downloader.set_single_pass(True)
+        downloader.set_max_workers(config['workers'])
+
+        first_byte = []
+        def listener(snapshot):
+            if not first_byte and snapshot['downloaded_bytes']:
+                first_byte.append(time.perf_counter())
+        downloader.set_progress_listener(listener, max_rate=1000)
+
+        start = time.perf_counter()
+        result = downloader.download_video()
+        seconds = time.perf_counter() - start
+        total_bytes = sum(os.path.getsize(path) for path in downloader.downloaded_files if os.path.exists(path))
+        return _measurement(
+            'download_video', size, seconds, len(downloader.downloaded_files), total_bytes,
+            ttfb_s=round(first_byte[0] - start, 4) if first_byte else None,
+            extractor_calls=LocalYoutubeDL.calls,
+            workers=config['workers'],
+            result=result,
+        )
+
+
+def _audio_fixtures(folder, size, media_size, real_audio):
+    """Write `size` MP3 files (and covers) and return their info dict entries"""
+    entries = []
+    for i in range(size):
+        path = os.path.join(folder, f"Track {i}.mp3")
+        if real_audio:
+            subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=frequency=440:duration=5',
+                            '-b:a', '192k', path], check=True)
+        else:
+            with open(path, 'wb') as f:
+                f.write(b'\xff\xfb\x90\x00' + b'\0' * (media_size - 4))  # MPEG frame header, silent payload
+        with open(os.path.join(folder, f"Track {i}.jpg"), 'wb') as f:
+            f.write(b'\xff\xd8\xff\xe0' + b'\0' * 16 * 1024)
+        entries.append({'id': f"vid{i}", 'title': f"Track {i}", 'uploader': 'Benchmark', 'upload_date': '20240101',
+                        'playlist_title': 'Benchmark', 'requested_downloads': [{'filepath': path}]})
+    return entries
+
+
+def bench_tagging(size, config):
+    """add_audio_metadata over `size` downloaded MP3 files with cover art"""
+    with tempfile.TemporaryDirectory() as folder:
+        entries = _audio_fixtures(folder, size, config['media_size'], real_audio=False)
+        downloader = Downloader(f"bench://playlist/{size}", folder)
+        downloader.get_audio_opts()
+        downloader.info = {'_type': 'playlist', 'entries': entries}
+        start = time.perf_counter()
+        result = downloader.add_audio_metadata()
+        seconds = time.perf_counter() - start
+        tagged = sum(1 for line in result.splitlines() if line.startswith("Metadata updated"))
+        return _measurement('add_audio_metadata', size, seconds, tagged)
+
+
+def bench_normalize(size, config):
+    """normalize_audio (two-pass) over `size` MP3 files, one after the other"""
+    with tempfile.TemporaryDirectory() as folder:
+        entries = _audio_fixtures(folder, size, config['media_size'], real_audio=config['real_audio'])
+        downloader = Downloader(f"bench://playlist/{size}", folder)
+        downloader.set_two_pass_normalization(True)
+        start = time.perf_counter()
+        results = [downloader.normalize_audio(entry['requested_downloads'][0]['filepath']) for entry in entries]
+        seconds = time.perf_counter() - start
+        normalized = sum(1 for message in results if message.startswith(("Normalized", "Already normalized")))
+        return _measurement('normalize_audio', size, seconds, normalized)
+
+
+def run_isolated(benchmark, size, config):
+    """Run one measurement in a fresh process so its peak RSS is not inflated by earlier ones"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(benchmark, size, config).result()
+
+
+def _ffmpeg_makes_audio():
+    """Whether the ffmpeg on PATH can generate real test audio"""
+    with tempfile.TemporaryDirectory() as folder:
+        try:
+            subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=duration=1',
+                            os.path.join(folder, 'probe.mp3')], check=True, capture_output=True)
+            return True
+        except (OSError, subprocess.CalledProcessError):
+            return False
+
+
+def suite(sizes, media_size=MEDIA_SIZE, latency=LATENCY, workers=3):
+    """Run every benchmark for every playlist size and return the JSON report"""
+    server, media_url = start_media_server()
+    has_ffmpeg = shutil.which('ffmpeg') is not None
+    config = {
+        'media_url': media_url,
+        'media_size': media_size,
+        'latency': latency,
+        'workers': workers,
+        'real_audio': has_ffmpeg and _ffmpeg_makes_audio(),
+    }
+    results = []
+    try:
+        for size in sizes:
+            results.append(run_isolated(bench_download, size, config))
+            results.append(run_isolated(bench_tagging, size, config))
+            if has_ffmpeg:
+                results.append(run_isolated(bench_normalize, size, config))
+            else:
+                results.append({'benchmark': 'normalize_audio', 'entries': size, 'skipped': "ffmpeg not found"})
+            for result in results[-3:]:
+                print(f"{result['benchmark']:>20} {size:>6} entries: "
+                      + (f"{result['seconds']:.3f}s, {result['files_per_second']} files/s" if 'seconds' in result
+                         else result['skipped']), file=sys.stderr)
+    finally:
+        server.shutdown()
+
+    return {
+        'config': {key: value for key, value in config.items() if key != 'media_url'},
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'yt_dlp': yt_dlp.version.__version__,
+            'cpu_count': os.cpu_count(),
+        },
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the YouTube Downloader without network access")
+    parser.add_argument("sizes", nargs="*", type=int, help="Playlist sizes")
+    parser.add_argument("--suite", action="store_true", help="Run the throughput / TTFB / peak RSS suite")
+    parser.add_argument("--media-size", type=int, default=MEDIA_SIZE, help=f"Bytes per media file (default: {MEDIA_SIZE})")
+    parser.add_argument("--latency", type=float, default=LATENCY, help=f"Seconds per request (default: {LATENCY})")
+    parser.add_argument("--workers", type=int, default=3, help="Simultaneous downloads (default: 3)")
+    parser.add_argument("--json", help="Write the suite report to this file instead of stdout")
+    args = parser.parse_args()
+
+    if not args.suite:
+        main(args.sizes or PLAYLIST_SIZES)
+    else:
+        report = suite(args.sizes or SUITE_SIZES, args.media_size, args.latency, args.workers)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Report written to {args.json}")
+        else:
+            print(json.dumps(report, indent=2))
@@ -1,4 +1,7 @@
-import os, subprocess
+import os, re, sys, subprocess
+
+PROFILE_RUNS = 3  # Startups averaged per measurement
+TOP_IMPORTS = 10  # Slowest top-level imports listed in the profile
 
 # Get the current script directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,6 +23,64 @@ nuitka_args = [
     "app.py"
 ]
 
-# Run Nuitka
-subprocess.run(nuitka_args, check=True)
 
+def measure_startup(command, import_times=False):
+    """Start the app with --profile-startup; returns (ms to first window, core loaded, import times)"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    if import_times:
+        command = [command[0], "-X", "importtime"] + command[1:]
+    result = subprocess.run(command + ["--profile-startup"], cwd=script_dir, env=env,
+                            capture_output=True, text=True, timeout=120)
+    match = re.search(r"STARTUP first_window_ms=([\d.]+) core_loaded=(\w+)", result.stdout)
+    if not match:
+        raise RuntimeError(f"No startup report from {command[0]}: {result.stderr.strip()[-500:]}")
+
+    # -X importtime lines: "import time: self [us] | cumulative | module"; top-level imports are not indented
+    imports = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[1].strip().isdigit():
+            if not parts[2].startswith("  "):
+                imports.append((int(parts[1]) / 1000, parts[2].strip()))
+    return float(match.group(1)), match.group(2) == "True", sorted(imports, reverse=True)
+
+
+def profile_startup(command, label, runs=PROFILE_RUNS):
+    """Print the average time to first window and the slowest imports before it"""
+    timings = [measure_startup(command)[0] for _ in range(runs)]
+    _, core_loaded, imports = measure_startup(command, import_times=command[0] == sys.executable)
+    average = sum(timings) / len(timings)
+    print(f"{label}: {average:.0f} ms to first window (best {min(timings):.0f} ms, "
+          f"download backend {'loaded' if core_loaded else 'deferred'})")
+    for elapsed, module in imports[:TOP_IMPORTS]:
+        print(f"    {elapsed:8.1f} ms  {module}")
+    return average
+
+
+def import_profile():
+    """Compare the deferred startup with importing everything before the window"""
+    lazy = profile_startup([sys.executable, "app.py"], "Lazy startup")
+    eager = profile_startup([sys.executable, "app.py", "--eager-imports"], "Eager startup")
+    print(f"Time to first window reduced by {eager - lazy:.0f} ms ({(eager - lazy) / eager:.0%})")
+
+
+def built_binary():
+    """Path of the standalone executable Nuitka produced"""
+    dist = os.path.join(script_dir, "build", "app.dist")
+    for name in ("app.exe", "app.bin", "app"):
+        if os.path.isfile(os.path.join(dist, name)):
+            return os.path.join(dist, name)
+    return None
+
+
+if __name__ == "__main__":
+    import_profile()
+    if "--profile-only" in sys.argv:
+        sys.exit(0)
+
+    # Run Nuitka
+    subprocess.run(nuitka_args, check=True)
+
+    binary = built_binary()
+    if binary:
+        profile_startup([binary], "Standalone build")
@@ -1,9 +1,25 @@
 import os
 import re
 import yt_dlp
-import subprocess
-from mutagen.easyid3 import EasyID3
-from mutagen.id3 import ID3NoHeaderError
+import itertools
+import threading
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from archive import DownloadArchive
+from folder_index import FolderIndex
+from fused_audio import FusedAudioPP
+from dedup import DedupIndex, deduplicate_files
+from journal import DownloadJournal
+from normalization import NormalizationPipeline, is_complete_file, normalize_file
+from progress import ProgressReporter, MAX_RATE
+from governor import THROTTLE_RETRIES
+from info_cache import InfoCache, DEFAULT_TTL, options_fingerprint
+from tagging import TaggingPool
+
+# Result messages of download_video that describe a failed run
+ERROR_PREFIXES = ("Error", "Download failed", "Unexpected error")
+INCREMENTAL_PAGE = 30  # Entries checked per archive lookup during an incremental sync (one YouTube listing page)
+
 
 class Downloader:
     def __init__(self, url, output_folder):
@@ -12,14 +28,57 @@ class Downloader:
         self.ydl_opts = {}
         self.info = {}
         self.progress_callback = None
+        self.progress_reporter = None  # Structured, throttled progress for listeners such as the GUI
         self.downloaded_files = []  # Track downloaded files
+        self.failed_files = 0  # Entries of the last download_video run that could not be downloaded
+        self.single_pass = False  # Reuse the first extraction instead of extracting twice
+        self.max_workers = 1  # Simultaneous playlist entry downloads
+        self.normalizer = None  # Pipeline fed with files as soon as they finish post-processing
+        self.normalization_results = []
+        self.two_pass_normalization = False  # Measure first and cache the loudness measurements
+        self.archive = None  # Download archive of the output folder, open while downloading
+        self.incremental_sync = 0  # Stop paging a playlist after this many known videos in a row (0 = off)
+        self.journal = None  # Per-entry progress journal, open while downloading
+        self.pending_normalization = []  # Finished files from an interrupted run that still need normalizing
+        self.tagger = None  # Tags audio files as soon as they are downloaded (and normalized)
+        self.pending_tags = {}  # Path -> (tags, cover) waiting for normalization to finish
+        self.tagged_files = set()
+        self.tagging_results = []
+        self.governor = None  # Shared bandwidth cap and throttling back-off, see governor.py
+        self.cache_ttl = 0  # Serve repeated extractions from the on-disk info cache for this long (0 = off)
+        self.info_cache = None  # Info cache of the output folder, open while in use
+        self.planned_files = []  # Files a preview found still to download
+        self.folder_index = None  # Snapshot of the output folder for existence and size checks
+        self.fused_audio = False  # Transcode, normalize and tag audio in one ffmpeg run per file
+        self.fused_files = {}  # Path -> normalized, for files finished by the fused pipeline
+        self.downloaded_ids = {}  # Final path -> video ID of the files downloaded in this run
+        self.dedup_path = None  # Dedup index shared with other output folders (None = off)
+        self.dedup_mode = 'hardlink'
 
     def set_progress_callback(self, callback):
         """Set a callback function to report download progress"""
         self.progress_callback = callback
-        
+
+    def set_progress_listener(self, listener, max_rate=MAX_RATE):
+        """Report numeric progress snapshots (bytes, speed, ETA, playlist totals) at most max_rate times per second"""
+        self.progress_reporter = ProgressReporter(listener, max_rate) if listener else None
+
+    def _report_complete(self):
+        """Tell the progress consumers that nothing is left to download"""
+        if self.progress_callback:
+            self.progress_callback("100")
+        if self.progress_reporter:
+            self.progress_reporter.finish()
+
     def _progress_hook(self, d):
         """Hook to capture download progress"""
+        if self.progress_reporter:
+            self.progress_reporter.update(d)
+
+        if d['status'] == 'finished' and self.journal:
+            info = d.get('info_dict') or {}
+            self.journal.set_stage(info.get('id'), self._download_kind(), 'downloaded', d.get('filename'))
+
         if self.progress_callback and d['status'] == 'downloading':
             try:
                 # Handle different progress formats
@@ -34,10 +93,19 @@ class Downloader:
                 else:
                     percent = "Downloading..."
                     
-                self.progress_callback(percent)
+                self.progress_callback(self._progress_label(d) + percent)
             except (KeyError, ZeroDivisionError, TypeError):
                 if self.progress_callback:
-                    self.progress_callback("Downloading...")
+                    self.progress_callback(self._progress_label(d) + "Downloading...")
+
+    def _progress_label(self, d):
+        """Prefix naming the entry of a progress update when several entries download at once"""
+        if self.max_workers <= 1:
+            return ""
+        info = d.get('info_dict') or {}
+        index = info.get('playlist_index')
+        title = (info.get('title') or info.get('id') or "")[:40]
+        return f"[{index}] {title}: " if index else f"{title}: "
 
     def sanitize_filename(self, filename):
         """Remove non-valid windows characters and limit length."""
@@ -64,25 +132,212 @@ class Downloader:
 
     def file_exists_check(self, filepath):
         """Check if file exists and has reasonable size"""
-        if not os.path.exists(filepath):
+        if self.folder_index:
+            return self.folder_index.is_complete(filepath)
+        return is_complete_file(filepath)
+
+    def _index_folder(self):
+        """Take one snapshot of the output folder per run instead of a stat call per entry"""
+        self.folder_index = FolderIndex(self.output_folder)
+        return self.folder_index
+
+    def _classify(self, entries, is_audio):
+        """Pair each entry with its existing file (None while it still has to be downloaded) and its archive backfill row"""
+        kind = 'audio' if is_audio else 'video'
+        entries = [entry for entry in entries if entry]
+        video_ids = [entry.get('id') for entry in entries]
+        # One batched archive lookup by video ID, so renamed titles are still recognised
+        known = self.archive.lookup(video_ids, kind) if self.archive else {}
+        journaled = self.journal.lookup(video_ids, kind) if self.journal else {}
+
+        classified = []
+        for entry in entries:
+            state = journaled.get(entry.get('id'))
+            if state and not self._resume_state(entry.get('id'), kind, state, is_audio):
+                classified.append((entry, None, None))  # Interrupted earlier; yt-dlp resumes its .part file
+                continue
+
+            record = known.get(entry.get('id'))
+            if record and self.folder_index.exists(record['path']):
+                classified.append((entry, record['path'], None))
+                continue
+
+            expected_file = self.get_expected_filename(entry, is_audio)
+            if self.file_exists_check(expected_file):
+                # Backfill files downloaded before the archive existed
+                backfill = (entry.get('id'), kind, expected_file, os.path.splitext(expected_file)[1][1:])
+                classified.append((entry, expected_file, backfill))
+            else:
+                classified.append((entry, None, None))
+        return classified
+
+    def _record_split(self, classified, is_audio):
+        """Backfill the archive, queue the missing entries in the journal and split them from the existing files"""
+        kind = 'audio' if is_audio else 'video'
+        existing_files = [os.path.basename(path) for _, path, _ in classified if path]
+        files_to_download = [entry for entry, path, _ in classified if not path]
+        backfill = [row for _, _, row in classified if row]
+
+        if self.archive and backfill:
+            self.archive.record_many(backfill)
+        if self.journal and files_to_download:
+            self.journal.queue([entry.get('id') for entry in files_to_download], kind)
+        return existing_files, files_to_download
+
+    def _report_existing(self, existing_files):
+        """Print the files a run skips"""
+        if existing_files:
+            existing_msg = f"Skipping {len(existing_files)} existing file(s): {', '.join(existing_files[:3])}"
+            if len(existing_files) > 3:
+                existing_msg += f" and {len(existing_files) - 3} more"
+            print(existing_msg)
+
+    def _split_existing(self, entries, is_audio):
+        """Split entries into already downloaded file names and entries still to download"""
+        existing_files, files_to_download = self._record_split(self._classify(entries, is_audio), is_audio)
+        self._report_existing(existing_files)
+        return existing_files, files_to_download
+
+    def _split_incremental(self, entries, is_audio, read):
+        """Page through entries in site order and stop at the first run of already downloaded videos.
+
+        Every video entry read is appended to read, so later steps never page through the rest."""
+        existing_files = []
+        files_to_download = []
+        self._sync_playlist(entries, is_audio, read, existing_files, files_to_download)
+        self._report_existing(existing_files)
+        return existing_files, files_to_download
+
+    def _sync_playlist(self, entries, is_audio, read, existing_files, files_to_download):
+        """Incremental sync of one playlist, a page of entries per archive and journal lookup.
+
+        Nested playlists, such as the Videos, Shorts and Live tabs of a bare channel URL, are paged
+        lazily in turn, each newest first with its own run of known videos."""
+        entries = iter(entries)
+        known_run = 0
+        while True:
+            page = list(itertools.islice(entries, INCREMENTAL_PAGE))
+            if not page:
+                return
+
+            videos = []
+            for entry in page:
+                if entry and entry.get('_type') == 'playlist':
+                    self._sync_playlist(entry.get('entries') or [], is_audio, read, existing_files, files_to_download)
+                else:
+                    videos.append(entry)
+
+            classified = self._classify(videos, is_audio)
+            for position, (_, path, _) in enumerate(classified):
+                known_run = known_run + 1 if path else 0
+                if known_run >= self.incremental_sync:
+                    classified = classified[:position + 1]  # Remaining (older) entries are never requested
+                    break
+
+            read.extend(entry for entry, _, _ in classified)
+            existing, missing = self._record_split(classified, is_audio)
+            existing_files.extend(existing)
+            files_to_download.extend(missing)
+            if known_run >= self.incremental_sync:
+                print(f"Reached {known_run} already downloaded video(s) in a row, stopping the sync")
+                return
+
+    def _resume_state(self, video_id, kind, state, is_audio):
+        """Check a journaled entry: True if its download finished, False if it must be (re)downloaded.
+
+        Unfinished stages are downloaded again, yt-dlp resumes from its .part file. Files are never deleted here."""
+        if state['stage'] != 'post_processed' or not state['path']:
             return False
-        
-        # Check if file size is reasonable (> 1KB)
-        try:
-            return os.path.getsize(filepath) > 1024
-        except OSError:
+        size = self.folder_index.size(state['path'])
+        if size is None:
             return False
+        if size != state['size']:
+            # Post-processed files were moved into place atomically, so a new size means the file
+            # was changed afterwards (e.g. retagged elsewhere), not truncated
+            self.journal.set_stage(video_id, kind, 'post_processed', state['path'])
+        if is_audio and getattr(self, 'normalize_audio_enabled', False) and not state['normalized']:
+            self.pending_normalization.append(state['path'])
+        return True
+
+    def _is_audio(self):
+        """Whether the current options extract audio"""
+        return 'FFmpegExtractAudio' in str(self.ydl_opts.get('postprocessors', []))
+
+    def _download_kind(self):
+        """Archive/journal key separating audio and video downloads of the same video"""
+        return 'audio' if self._is_audio() else 'video'
+
+    def _track_downloaded(self, info):
+        """Record and return the final paths of the files produced for an info dict"""
+        if not info:
+            return []
+        if 'entries' in info:
+            paths = []
+            for entry in info['entries']:
+                paths.extend(self._track_downloaded(entry))
+            return paths
+        # 'requested_downloads' holds the path after post-processing (e.g. the .mp3)
+        paths = [d['filepath'] for d in info.get('requested_downloads', []) if d.get('filepath')]
+        if not paths and '_filename' in info:
+            paths = [info['_filename']]
+        self.downloaded_files.extend(paths)
+        for path in paths:
+            self.downloaded_ids[path] = info.get('id')
+        if self.folder_index:
+            # Final files and their (converted) thumbnails were just written
+            thumbnails = [t['filepath'] for t in info.get('thumbnails') or [] if t.get('filepath')]
+            self.folder_index.refresh(paths + thumbnails)
+        if self.archive and paths:
+            fmt = ' '.join(str(info[key]) for key in ('ext', 'format_id') if info.get(key))
+            self.archive.record(info.get('id'), self._download_kind(), paths[-1], fmt or None)
+        if self.journal and paths:
+            self.journal.set_stage(info.get('id'), self._download_kind(), 'post_processed', paths[-1])
+            if paths[-1] in self.fused_files:
+                self.journal.mark_done(paths[-1], 'tagged')
+                if self.fused_files[paths[-1]]:
+                    self.journal.mark_done(paths[-1], 'normalized')
+        return paths
+
+    def _normalize_entries(self, entries):
+        """Normalize the audio files of the given entries in a process pool"""
+        pipeline = self._create_normalizer()
+        for entry in entries:
+            if not entry:
+                continue
+            expected_file = self.get_expected_filename(entry, True)
+            if self.file_exists_check(expected_file):
+                pipeline.submit(expected_file)
+        return pipeline.join()
+
+    def _summary(self, download_count, skip_count):
+        """Build the message returned once a download run has finished"""
+        result_msg = f"Download completed! Downloaded: {download_count} file(s)"
+        if skip_count > 0:
+            result_msg += f", Skipped: {skip_count} existing file(s)"
+        return result_msg
 
     def download_video(self):
         """Download video/audio with the correct settings."""
         try:
             # Add progress hooks to options
             self.ydl_opts['progress_hooks'] = [self._progress_hook]
-            
+            if self.governor:
+                self.ydl_opts.update(self.governor.options())
+
+            os.makedirs(self.output_folder, exist_ok=True)
+            self.archive = DownloadArchive(self.output_folder)
+            self.journal = DownloadJournal(self.output_folder)
+            self.info_cache = InfoCache(self.output_folder, self.cache_ttl) if self.cache_ttl else None
+            self._index_folder()
+            self.pending_normalization = []
+
+            if self.single_pass or self.max_workers > 1 or self.incremental_sync:
+                return self._download_single_pass()
+
             # First extract info without downloading to check if files exist
             with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
                 try:
-                    self.info = ydl.extract_info(self.url, download=False)
+                    self.info = self._extract_listing(ydl, fresh=True)
                 except Exception as e:
                     return f"Error extracting video info: {str(e)}"
 
@@ -91,109 +346,300 @@ class Downloader:
 
             # Handle playlists vs single videos
             entries = self.info.get('entries', [self.info])
-            is_audio = 'FFmpegExtractAudio' in str(self.ydl_opts.get('postprocessors', []))
+            is_audio = self._is_audio()
             
             # Check for existing files
-            existing_files = []
-            files_to_download = []
-            
-            for entry in entries:
-                if not entry:
-                    continue
-                    
-                expected_file = self.get_expected_filename(entry, is_audio)
-                if self.file_exists_check(expected_file):
-                    existing_files.append(os.path.basename(expected_file))
-                else:
-                    files_to_download.append(entry)
-
-            # Report existing files
-            if existing_files:
-                existing_msg = f"Skipping {len(existing_files)} existing file(s): {', '.join(existing_files[:3])}"
-                if len(existing_files) > 3:
-                    existing_msg += f" and {len(existing_files) - 3} more"
-                print(existing_msg)
+            existing_files, files_to_download = self._split_existing(entries, is_audio)
 
             # If all files exist, return early
             if not files_to_download:
-                if self.progress_callback:
-                    self.progress_callback("100")
+                self._report_complete()
                 return f"All files already exist. Skipped {len(existing_files)} file(s)."
 
-            # Proceed with download for remaining files
-            results = []
-            
+            if self.progress_reporter:
+                self.progress_reporter.start(len(files_to_download))
+
             # Download the files
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
+            with self._session(self.ydl_opts) as ydl:
                 try:
                     # Download and get fresh info
-                    downloaded_info = ydl.extract_info(self.url, download=True)
+                    with self._governed(ydl):
+                        downloaded_info = ydl.extract_info(self.url, download=True)
                     self.info = downloaded_info  # Update with fresh info
                     
                     # Track what was actually downloaded
-                    if 'entries' in downloaded_info:
-                        for entry in downloaded_info['entries']:
-                            if entry and '_filename' in entry:
-                                self.downloaded_files.append(entry['_filename'])
-                    elif '_filename' in downloaded_info:
-                        self.downloaded_files.append(downloaded_info['_filename'])
+                    self._track_downloaded(downloaded_info)
+                    self._cache_entries(downloaded_info.get('entries', [downloaded_info]) if downloaded_info else [])
                         
                 except Exception as e:
                     return f"Download failed: {str(e)}"
+            if self.progress_reporter:
+                self.progress_reporter.finish()
 
-            # Handle audio normalization if needed
-            if is_audio and hasattr(self, 'normalize_audio_enabled') and self.normalize_audio_enabled:
-                normalization_results = []
-                entries = self.info.get('entries', [self.info])
-                
-                for entry in entries:
-                    if not entry:
-                        continue
-                    expected_file = self.get_expected_filename(entry, True)
-                    if self.file_exists_check(expected_file):
-                        norm_result = self.normalize_audio(expected_file)
-                        normalization_results.append(norm_result)
-                
-                if normalization_results:
-                    results.extend(normalization_results)
+            # Handle audio normalization if needed (the fused pipeline already normalized while transcoding)
+            if is_audio and getattr(self, 'normalize_audio_enabled', False) and not self.fused_audio:
+                self._normalize_entries(self.info.get('entries', [self.info]))
 
-            download_count = len(files_to_download)
-            skip_count = len(existing_files)
-            
-            result_msg = f"Download completed! Downloaded: {download_count} file(s)"
-            if skip_count > 0:
-                result_msg += f", Skipped: {skip_count} existing file(s)"
-                
-            return result_msg
+            return self._summary(len(files_to_download), len(existing_files))
 
         except Exception as e:
             return f"Unexpected error: {str(e)}"
 
+        finally:
+            if self.archive:
+                self.archive.close()
+                self.archive = None
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+            if self.info_cache:
+                self.info_cache.close()
+                self.info_cache = None
+
+    def _download_single_pass(self):
+        """Extract once and download only the missing entries, reusing the extraction session"""
+        # Playlist entries are left unresolved so skipped ones never cost a metadata request
+        opts = dict(self.ydl_opts, extract_flat='in_playlist')
+        with self._session(opts) as ydl:
+            try:
+                # Unprocessed results keep playlist entries as a lazy, page-by-page iterator
+                if self.incremental_sync:
+                    self.info = ydl.extract_info(self.url, download=False, process=False)
+                else:
+                    self.info = self._extract_listing(ydl, fresh=True)
+                if self.info and self.incremental_sync and 'entries' not in self.info:
+                    self.info = ydl.process_ie_result(self.info, download=False)
+            except Exception as e:
+                return f"Error extracting video info: {str(e)}"
+
+            if not self.info:
+                return "Error: Could not extract video information"
+
+            is_playlist = 'entries' in self.info
+            is_audio = self._is_audio()
+
+            if is_playlist and self.incremental_sync:
+                entries = []
+                existing_files, files_to_download = self._split_incremental(self.info['entries'], is_audio, entries)
+                # Only the pages read so far; later users of self.info must not page through the rest
+                self.info['entries'] = entries
+            else:
+                entries = list(self.info['entries']) if is_playlist else [self.info]
+                existing_files, files_to_download = self._split_existing(entries, is_audio)
+
+            if not files_to_download and not self.pending_normalization:
+                self._report_complete()
+                return f"All files already exist. Skipped {len(existing_files)} file(s)."
+
+            if self.progress_reporter:
+                self.progress_reporter.start(len(files_to_download))
+
+            # Files are normalized and tagged while the rest of the playlist keeps downloading
+            if is_audio:
+                self.tagger = TaggingPool(callback=self._tagging_done)
+            if is_audio and getattr(self, 'normalize_audio_enabled', False) and (self.pending_normalization or not self.fused_audio):
+                self.normalizer = self._create_normalizer()
+                for path in self.pending_normalization:
+                    self.normalizer.submit(path)
+
+            try:
+                playlist = self.info if is_playlist else None
+                if self.max_workers > 1 and len(files_to_download) > 1:
+                    downloaded = self._download_concurrently(files_to_download, playlist)
+                else:
+                    downloaded = {}
+                    for entry in files_to_download:
+                        result = self._download_entry(ydl, entry, playlist)
+                        if result:
+                            downloaded[id(entry)] = result
+            finally:
+                # Normalization feeds the tagger, so it has to drain first
+                if self.normalizer:
+                    self.normalizer.join()
+                    self.normalizer = None
+                if self.tagger:
+                    self.tagger.join()
+                    self.tagger = None
+
+        # Keep self.info pointing at resolved entries so metadata tagging can use them
+        if is_playlist:
+            self.info['entries'] = [downloaded.get(id(entry), entry) for entry in entries]
+        elif downloaded:
+            self.info = next(iter(downloaded.values()))
+
+        result_msg = self._summary(len(downloaded), len(existing_files))
+        failed = len(files_to_download) - len(downloaded)
+        self.failed_files = failed
+        if failed:
+            result_msg += f", Failed: {failed} file(s)"
+        return result_msg
+
+    def _download_concurrently(self, entries, playlist=None):
+        """Download entries on a bounded worker pool, one YoutubeDL session per worker thread"""
+        local = threading.local()
+        lock = threading.Lock()
+
+        with ExitStack() as sessions:
+            def worker(entry):
+                # YoutubeDL instances are not thread-safe, so each worker keeps its own
+                if not hasattr(local, 'ydl'):
+                    ydl = self._session(self.ydl_opts)
+                    with lock:
+                        local.ydl = sessions.enter_context(ydl)
+                return self._download_entry(local.ydl, entry, playlist)
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = pool.map(worker, entries)
+                return {id(entry): result for entry, result in zip(entries, results) if result}
+
+    def _download_entry(self, ydl, entry, playlist=None):
+        """Resolve (if still flat) and download a single entry in an open YoutubeDL session"""
+        extra_info = {}
+        if playlist:
+            extra_info = {
+                'playlist_id': playlist.get('id'),
+                'playlist_title': playlist.get('title'),
+                'playlist_uploader': playlist.get('uploader'),
+            }
+        if self.journal:
+            self.journal.set_stage(entry.get('id'), self._download_kind(), 'downloading')
+        try:
+            # Entries that failed on a 429/403 are tried again once the governor's back-off is over
+            attempts = THROTTLE_RETRIES + 1 if self.governor else 1
+            for attempt in range(attempts):
+                with self._governed(ydl):
+                    result = ydl.process_ie_result(entry, download=True, extra_info=extra_info)
+                throttled = self.governor and self.governor.was_throttled()
+                if not throttled or (result and result.get('requested_downloads')):
+                    break
+        except Exception as e:
+            print(f"Download failed for {entry.get('title', 'unknown')}: {str(e)}")
+            return None
+        finally:
+            if self.progress_reporter:
+                self.progress_reporter.entry_finished(entry.get('id'))
+        if result:
+            result.update({k: v for k, v in extra_info.items() if v is not None and k not in result})
+            self._cache_entries([result])
+            for path in self._track_downloaded(result):
+                self._queue_finished_file(path, result)
+        return result
+
+    def _extract_listing(self, ydl, fresh=False):
+        """extract_info(download=False) for self.url, served from the info cache while it is fresh.
+
+        Downloads pass fresh=True: they always list the URL again so new uploads are never missed,
+        and only refresh the cached listing used by previews and tagging."""
+        fingerprint = options_fingerprint(ydl.params)
+        if self.info_cache and not fresh:
+            cached = self.info_cache.get(self.url, fingerprint)
+            if cached:
+                print(f"Using cached extraction of {self.url}")
+                return cached
+        info = ydl.extract_info(self.url, download=False)
+        if self.info_cache and info:
+            self.info_cache.put(self.url, fingerprint, info)
+        return info
+
+    def _cache_entries(self, entries):
+        """Store resolved entries so previews and tagging can reuse their metadata"""
+        if self.info_cache:
+            resolved = [entry for entry in entries if entry and entry.get('_type', 'video') == 'video']
+            self.info_cache.put_many([(entry.get('id'), entry) for entry in resolved], options_fingerprint(self.ydl_opts))
+
+    def _with_cached_metadata(self, entries):
+        """Replace flat playlist entries by their cached resolved info dicts where available"""
+        if not self.info_cache:
+            return entries
+        flat_ids = [entry.get('id') for entry in entries if entry and entry.get('_type') == 'url']
+        cached = self.info_cache.get_many(flat_ids, options_fingerprint(self.ydl_opts)) if flat_ids else {}
+        return [cached.get(entry.get('id'), entry) if entry else entry for entry in entries]
+
+    def preview(self):
+        """Dry run: report which files download_video would fetch, without downloading anything"""
+        folder_exists = os.path.isdir(self.output_folder)
+        self.archive = DownloadArchive(self.output_folder) if folder_exists else None
+        self.info_cache = InfoCache(self.output_folder, self.cache_ttl) if folder_exists and self.cache_ttl else None
+        self._index_folder()
+        try:
+            # Same options as a single-pass download, so both share the cached extraction
+            with yt_dlp.YoutubeDL(dict(self.ydl_opts, extract_flat='in_playlist', quiet=True)) as ydl:
+                self.info = self._extract_listing(ydl)
+            if not self.info:
+                return "Error: Could not extract video information"
+
+            entries = list(self.info['entries']) if 'entries' in self.info else [self.info]
+            is_audio = self._is_audio()
+            existing_files, files_to_download = self._split_existing(entries, is_audio)
+            self.planned_files = [os.path.basename(self.get_expected_filename(entry, is_audio)) for entry in files_to_download]
+
+            if not self.planned_files:
+                return f"Nothing to download. {len(existing_files)} file(s) already exist."
+            result_msg = f"Would download {len(self.planned_files)} file(s): {', '.join(self.planned_files[:3])}"
+            if len(self.planned_files) > 3:
+                result_msg += f" and {len(self.planned_files) - 3} more"
+            if existing_files:
+                result_msg += f", Skip: {len(existing_files)} existing file(s)"
+            return result_msg
+        except Exception as e:
+            return f"Error extracting video info: {str(e)}"
+        finally:
+            if self.archive:
+                self.archive.close()
+                self.archive = None
+            if self.info_cache:
+                self.info_cache.close()
+                self.info_cache = None
+
+    def _session(self, opts):
+        """Create a YoutubeDL session, replacing audio extraction by the fused pipeline when enabled"""
+        if not (self.fused_audio and self._is_audio()):
+            return yt_dlp.YoutubeDL(opts)
+        postprocessors = [pp for pp in opts.get('postprocessors', []) if pp.get('key') != 'FFmpegExtractAudio']
+        ydl = yt_dlp.YoutubeDL(dict(opts, postprocessors=postprocessors))
+        ydl.add_post_processor(FusedAudioPP(
+            describe=self._tag_request,
+            on_done=self._fused_done,
+            normalize=getattr(self, 'normalize_audio_enabled', False),
+            two_pass=self.two_pass_normalization,
+            cache_path=self.loudness_cache_path(),
+        ), when='post_process')
+        return ydl
+
+    def _fused_done(self, filepath, normalized):
+        """Record a file the fused pipeline has already tagged (and normalized)"""
+        name = os.path.basename(filepath)
+        self.tagged_files.add(filepath)
+        self.tagging_results.append(f"Metadata updated: {name}")
+        if normalized:
+            self.normalization_results.append(f"Normalized: {name}")
+        self.fused_files[filepath] = normalized
+
+    def _governed(self, ydl):
+        """Context for one download under the governor, if any"""
+        return self.governor.download(ydl) if self.governor else nullcontext()
+
     def get_audio_opts(self):
         """Configure options for audio download without normalization"""
+        # Tags and cover art are written by the tagging stage in one mutagen save, instead of
+        # FFmpegMetadata and EmbedThumbnail each remuxing the whole file
         postprocessors = [
             {
                 'key': 'FFmpegExtractAudio',
                 'preferredcodec': 'mp3',
                 'preferredquality': '192',
             },
-            {'key': 'FFmpegMetadata'},
+            # Only the small thumbnail image is converted, so mutagen can embed it as JPEG
+            {'key': 'FFmpegThumbnailsConvertor', 'format': 'jpg', 'when': 'before_dl'},
         ]
-        
-        # Only add thumbnail embedding if available
-        try:
-            postprocessors.append({'key': 'EmbedThumbnail'})
-        except:
-            pass  # Skip if thumbnail embedding fails
 
         self.ydl_opts = {
             'format': 'bestaudio/best',
             'outtmpl': os.path.join(self.output_folder, '%(title)s.%(ext)s'),
             'postprocessors': postprocessors,
             'writethumbnail': True,
-            'embedthumbnail': True,
-            'addmetadata': True,
             'ignoreerrors': True,  # Continue on errors
+            'continuedl': True,  # Resume .part files left by an interrupted run
             'no_warnings': False,
         }
 
@@ -203,6 +649,7 @@ class Downloader:
             'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
             'outtmpl': os.path.join(self.output_folder, '%(title)s.%(ext)s'),
             'ignoreerrors': True,  # Continue on errors
+            'continuedl': True,  # Resume .part files left by an interrupted run
             'no_warnings': False,
         }
 
@@ -216,118 +663,221 @@ class Downloader:
             else:
                 self.ydl_opts[option_key] = option_value
 
+    def _tag_request(self, entry, filepath):
+        """Build the ID3 tags and cover art path for a downloaded entry"""
+        tags = {
+            'title': self.sanitize_filename(entry.get('title', 'Unknown Title')),
+            'artist': entry.get('uploader', 'Unknown Artist'),
+            'album': entry.get('playlist_title', entry.get('playlist', 'YouTube Download')),
+        }
+        if entry.get('upload_date'):
+            tags['date'] = entry['upload_date'][:4]  # Year only
+
+        # Thumbnail written (and converted to jpg) by yt-dlp next to the media file
+        covers = [t['filepath'] for t in entry.get('thumbnails') or [] if t.get('filepath')]
+        covers += [os.path.splitext(filepath)[0] + ext for ext in ('.jpg', '.png')]
+        # The thumbnail was written after the folder snapshot (fused mode runs before _track_downloaded)
+        self.folder_index.refresh(covers)
+        cover_path = next((cover for cover in covers if self.folder_index.exists(cover)), None)
+        return tags, cover_path
+
+    def _queue_finished_file(self, path, entry):
+        """Send a finished MP3 through normalization (if enabled) and then tagging"""
+        if not path.endswith('.mp3') or path in self.fused_files:
+            return
+        tags, cover_path = self._tag_request(entry, path)
+        if self.normalizer:
+            # Tag after normalizing so ffmpeg never rewrites the file after mutagen
+            self.pending_tags[path] = (tags, cover_path)
+            self.normalizer.submit(path)
+        elif self.tagger:
+            self.tagger.submit(path, tags, cover_path)
+
+    def _tagging_done(self, filepath, message):
+        """Record a tagged file as soon as its worker completes"""
+        self.tagging_results.append(message)
+        if message.startswith("Metadata updated"):
+            self.tagged_files.add(filepath)
+            self.folder_index.refresh([filepath])
+            if self.journal:
+                self.journal.mark_done(filepath, 'tagged')
+
     def add_audio_metadata(self):
         """Add ID3 metadata to downloaded audio files."""
+        if self.cache_ttl and os.path.isdir(self.output_folder):
+            self.info_cache = InfoCache(self.output_folder, self.cache_ttl)
+            if not self.info:
+                # Tag the files of an earlier run without extracting again
+                listing_opts = dict(self.ydl_opts, extract_flat='in_playlist')
+                self.info = self.info_cache.get(self.url, options_fingerprint(listing_opts)) or {}
+
         if not self.info:
+            if self.info_cache:
+                self.info_cache.close()
+                self.info_cache = None
             return "Error: No file information available."
 
-        entries = self.info.get('entries', [self.info]) 
-        results = []
-        processed_files = set()  # Prevent duplicate processing
+        results = list(self.tagging_results)  # Files already tagged while downloading
+        processed_files = set(self.tagged_files)  # Prevent duplicate processing
+        index = self.folder_index or self._index_folder()  # Reuse the snapshot kept current while downloading
+        self.journal = DownloadJournal(self.output_folder) if os.path.isdir(self.output_folder) else None
+        # Skipped entries are still flat; their uploader and date come from earlier extractions
+        entries = self._with_cached_metadata(self.info.get('entries', [self.info]))
+        journaled = self.journal.lookup([entry.get('id') for entry in entries if entry], 'audio') if self.journal else {}
+        tagger = TaggingPool(callback=self._tagging_done)
 
-        for entry in entries:
-            if not entry:
-                continue
-                
-            try:
-                title = self.sanitize_filename(entry.get('title', 'Unknown Title'))
-                artist = entry.get('uploader', 'Unknown Artist')
-                album = entry.get('playlist_title', entry.get('playlist', 'YouTube Download'))
-                
-                # Determine the actual filename
-                filename = None
-                
-                # Try to get the actual downloaded filename
-                if '_filename' in entry:
-                    base_filename = os.path.splitext(entry['_filename'])[0] + ".mp3"
-                    if os.path.exists(base_filename):
-                        filename = base_filename
-                
-                # Fallback to expected filename
-                if not filename:
-                    filename = os.path.join(self.output_folder, f"{title}.mp3")
-                
-                # Skip if file doesn't exist or already processed
-                if not self.file_exists_check(filename) or filename in processed_files:
+        try:
+            for entry in entries:
+                if not entry:
                     continue
                     
-                processed_files.add(filename)
-                
                 try:
-                    # Try to load existing ID3 tags
-                    try:
-                        audio = EasyID3(filename)
-                    except ID3NoHeaderError:
-                        # Create new ID3 tag if none exists
-                        audio = EasyID3()
-                        results.append(f"Created ID3 header for: {os.path.basename(filename)}")
+                    # Determine the actual filename
+                    filename = None
                     
-                    # Add metadata
-                    audio["title"] = title
-                    audio["artist"] = artist
-                    audio["album"] = album
+                    # Try to get the actual downloaded filename
+                    downloaded = [d['filepath'] for d in entry.get('requested_downloads', []) if d.get('filepath')]
+                    if downloaded and index.exists(downloaded[-1]):
+                        filename = downloaded[-1]
+                    elif '_filename' in entry:
+                        base_filename = os.path.splitext(entry['_filename'])[0] + ".mp3"
+                        if index.exists(base_filename):
+                            filename = base_filename
                     
-                    # Add additional metadata if available
-                    if entry.get('upload_date'):
-                        audio["date"] = entry['upload_date'][:4]  # Year only
+                    # Fallback to expected filename
+                    if not filename:
+                        filename = self.get_expected_filename(entry, True)
                     
-                    audio.save(filename)
-                    results.append(f"Metadata updated: {os.path.basename(filename)}")
+                    # Skip if file doesn't exist or already processed
+                    if not self.file_exists_check(filename) or filename in processed_files:
+                        continue
+                        
+                    processed_files.add(filename)
                     
-                except Exception as e:
-                    results.append(f"Error updating metadata for {os.path.basename(filename)}: {str(e)}")
+                    # Already tagged by an earlier (possibly interrupted) run and untouched since
+                    state = journaled.get(entry.get('id'))
+                    if state and state['tagged'] and state['path'] == filename and index.size(filename) == state['size']:
+                        continue
                     
-            except Exception as e:
-                results.append(f"Error processing entry: {str(e)}")
-                continue
+                    tagger.submit(filename, *self._tag_request(entry, filename))
+                        
+                except Exception as e:
+                    results.append(f"Error processing entry: {str(e)}")
+                    continue
+
+            results.extend(tagger.join())
+        finally:
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+            if self.info_cache:
+                self.info_cache.close()
+                self.info_cache = None
                 
         return "\n".join(results) if results else "No audio files found for metadata update."
 
+    def deduplicate(self):
+        """Hardlink byte-identical downloads to files already in an indexed folder (skip mode removes every match).
+
+        Run it after add_audio_metadata: tagging a hard link would change every linked copy."""
+        if not self.dedup_path:
+            return "Deduplication disabled."
+        paths = [path for path in dict.fromkeys(self.downloaded_files) if os.path.isfile(path)]
+        if not paths:
+            return "No downloaded files to deduplicate."
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.dedup_path)), exist_ok=True)
+        index = DedupIndex(self.dedup_path)
+        self.archive = DownloadArchive(self.output_folder)
+        self.journal = DownloadJournal(self.output_folder)
+        kind = self._download_kind()
+
+        def on_skip(duplicate, original):
+            # Point the records at the kept copy so the video is not downloaded again
+            video_id = self.downloaded_ids.get(duplicate)
+            try:
+                self.archive.record(video_id, kind, original)
+            except ValueError:
+                print(f"Archive cannot refer to {original} (other drive), the video may be downloaded again")
+            self.journal.set_stage(video_id, kind, 'post_processed', original)
+
+        try:
+            messages, saved, reclaimable = deduplicate_files(index, paths, self.dedup_mode, on_skip)
+        finally:
+            index.close()
+            self.archive.close()
+            self.archive = None
+            self.journal.close()
+            self.journal = None
+        if self.folder_index:
+            self.folder_index.refresh(paths)
+
+        for message in messages:
+            print(message)
+        if not messages:
+            return f"No duplicates among {len(paths)} file(s)."
+        return (f"Found {len(messages)} duplicate(s): {saved / (1024 * 1024):.1f} MiB saved, "
+                f"{reclaimable / (1024 * 1024):.1f} MiB only reported")
+
     def normalize_audio(self, input_path):
         """Normalize audio using ffmpeg loudnorm filter"""
-        if not self.file_exists_check(input_path):
-            return f"Error: File not found - {os.path.basename(input_path)}"
-            
-        temp_path = input_path.replace('.mp3', '_normalized_temp.mp3')
-        
-        try:
-            cmd = [
-                'ffmpeg', '-i', input_path,
-                '-af', 'loudnorm=I=-16:TP=-1.5:LRA=11',
-                '-y', temp_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            
-            if result.returncode == 0 and self.file_exists_check(temp_path):
-                # Replace original with normalized version
-                try:
-                    os.replace(temp_path, input_path)
-                    return f"Normalized: {os.path.basename(input_path)}"
-                except OSError as e:
-                    return f"Error replacing file: {str(e)}"
-            else:
-                # Clean up temp file if it exists
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except OSError:
-                        pass
-                        
-                error_msg = result.stderr if result.stderr else "Unknown ffmpeg error"
-                return f"Normalization failed for {os.path.basename(input_path)}: {error_msg}"
-                
-        except subprocess.TimeoutExpired:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except OSError:
-                    pass
-            return f"Normalization timeout for {os.path.basename(input_path)}"
-            
-        except Exception as e:
-            return f"Normalization error for {os.path.basename(input_path)}: {str(e)}"
+        return normalize_file(input_path, self.two_pass_normalization, self.loudness_cache_path())
+
+    def loudness_cache_path(self):
+        """Location of the persistent loudness measurement cache for the output folder"""
+        return os.path.join(self.output_folder, '.loudnorm_cache.db')
+
+    def _create_normalizer(self):
+        """Create a normalization pipeline configured like this downloader"""
+        return NormalizationPipeline(
+            callback=self._normalization_done,
+            two_pass=self.two_pass_normalization,
+            cache_path=self.loudness_cache_path()
+        )
+
+    def _normalization_done(self, input_path, message):
+        """Report a finished normalization as soon as its worker completes"""
+        self.normalization_results.append(message)
+        print(message)
+        self.folder_index.refresh([input_path])
+        if self.journal and message.startswith(("Normalized", "Already normalized")):
+            self.journal.mark_done(input_path, 'normalized')
+        tag_request = self.pending_tags.pop(input_path, None)
+        if tag_request and self.tagger:
+            self.tagger.submit(input_path, *tag_request)
+
+    def set_single_pass(self, enable):
+        """Enable or disable single-pass extraction (one shared YoutubeDL session)"""
+        self.single_pass = enable
+
+    def set_max_workers(self, workers):
+        """Set how many playlist entries are downloaded simultaneously"""
+        self.max_workers = max(1, int(workers))
+
+    def set_two_pass_normalization(self, enable):
+        """Enable or disable two-pass loudnorm with cached measurements"""
+        self.two_pass_normalization = enable
+
+    def set_incremental_sync(self, known_run=5):
+        """Stop paging a channel/playlist after known_run already downloaded videos in a row (0 disables)"""
+        self.incremental_sync = max(0, int(known_run))
+
+    def set_governor(self, governor):
+        """Share a DownloadGovernor (bandwidth cap, fragment workers, back-off) with other downloads"""
+        self.governor = governor
+
+    def set_info_cache(self, ttl=DEFAULT_TTL):
+        """Reuse extractions younger than ttl seconds for previews and tagging (0 = off); downloads always list the URL again"""
+        self.cache_ttl = ttl
+
+    def set_fused_audio(self, enable):
+        """Enable or disable the single ffmpeg run for transcoding, normalizing and tagging audio"""
+        self.fused_audio = enable
+
+    def set_dedup(self, index_path, mode='hardlink'):
+        """Share a dedup index with other output folders; mode is 'hardlink', 'skip' or 'report' (None = off)"""
+        self.dedup_path = index_path
+        self.dedup_mode = mode
 
     def set_normalize_audio(self, enable):
         """Enable or disable audio normalization"""
@@ -0,0 +1,326 @@
+"""Content-hash and audio-fingerprint deduplication shared by several output folders.
+
+Usage: python dedup.py FOLDER [FOLDER ...] [--index dedup.db] [--apply hardlink|skip] [--workers 4]
+
+Without --apply the scan only indexes the folders and reports duplicate groups.
+Audio fingerprints come from chromaprint's fpcalc when it is installed.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import argparse
+import threading
+import subprocess
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+QUICK_HASH_BYTES = 1024 * 1024  # Bytes hashed at the start and at the end of a file for the quick hash
+FINGERPRINT_RATE = 4000  # Hz of the mono signal the audio fingerprint is taken from
+FINGERPRINT_WINDOW = 0.25  # Seconds per energy window
+FINGERPRINT_SECONDS = 120  # Only the start of a track is fingerprinted
+DURATION_TOLERANCE = 1.0  # Seconds two recordings of the same audio may differ by
+CHROMAPRINT_MAX_ERROR = 0.10  # Share of differing chromaprint bits that still counts as the same audio
+CHROMAPRINT_MAX_OFFSET = 8  # Fingerprint items the two streams may be shifted by (about 1 s)
+MAX_BIT_ERROR = 0.05  # Same for the built-in energy fingerprint, used when fpcalc is missing
+QUIET_ENERGY = 0.01  # Windows quieter than this share of the loudest one carry no bit (silent intros)
+MIN_FINGERPRINT_BITS = 120  # Fewer compared bits (30 s of sound) are too weak to match on
+MEDIA_EXTENSIONS = ('.mp3', '.mp4', '.m4a', '.webm', '.mkv', '.opus')
+
+
+def quick_hash(filepath, size):
+    """SHA-256 of the size and the first and last megabyte; full hashes are only needed on a match"""
+    digest = hashlib.sha256(str(size).encode('ascii'))
+    with open(filepath, 'rb') as f:
+        digest.update(f.read(QUICK_HASH_BYTES))
+        if size > 2 * QUICK_HASH_BYTES:
+            f.seek(-QUICK_HASH_BYTES, os.SEEK_END)
+            digest.update(f.read(QUICK_HASH_BYTES))
+    return digest.hexdigest()
+
+
+def content_hash(filepath, chunk_size=1024 * 1024):
+    """SHA-256 of the whole file"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def audio_fingerprint(filepath):
+    """Return (duration, fingerprint) of an audio file, or (None, None) when it cannot be decoded"""
+    if shutil.which('fpcalc'):
+        return chromaprint_fingerprint(filepath)
+    return energy_fingerprint(filepath)
+
+
+def chromaprint_fingerprint(filepath):
+    """Raw chromaprint fingerprint from fpcalc, stored as "cp:" and comma separated 32-bit items"""
+    cmd = ['fpcalc', '-raw', '-json', '-length', str(FINGERPRINT_SECONDS), filepath]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        data = json.loads(result.stdout) if result.returncode == 0 else {}
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return None, None
+    items = data.get('fingerprint') or []
+    if len(items) * 32 < MIN_FINGERPRINT_BITS:
+        return None, None
+    return data.get('duration'), 'cp:' + ','.join(str(item) for item in items)
+
+
+def energy_fingerprint(filepath):
+    """Fallback fingerprint: one bit per window, whether the signal energy rises into the next window.
+
+    That survives re-encoding, other bitrates, new tags and loudness normalization. Quiet windows
+    are stored as "-" and never compared, so shared silent intros do not make tracks match."""
+    cmd = ['ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error', '-i', filepath,
+           '-t', str(FINGERPRINT_SECONDS), '-ac', '1', '-ar', str(FINGERPRINT_RATE), '-f', 's16le', '-']
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=300)
+    except (OSError, subprocess.TimeoutExpired):
+        return None, None
+    if result.returncode != 0:
+        return None, None
+
+    samples = array('h')
+    samples.frombytes(result.stdout[:len(result.stdout) // 2 * 2])
+    window = int(FINGERPRINT_RATE * FINGERPRINT_WINDOW)
+    energies = [sum(s * s for s in samples[start:start + window])
+                for start in range(0, len(samples) - window + 1, window)]
+    quiet = max(energies, default=0) * QUIET_ENERGY
+    bits = ''.join('-' if max(earlier, later) <= quiet else '1' if later > earlier else '0'
+                   for earlier, later in zip(energies, energies[1:]))
+    if len(bits) - bits.count('-') < MIN_FINGERPRINT_BITS:
+        return None, None
+    return _duration(filepath, len(samples)), bits
+
+
+def _duration(filepath, sample_count):
+    """Length of the track, from the MP3 headers when possible"""
+    try:
+        from mutagen.mp3 import MP3
+        return MP3(filepath).info.length
+    except Exception:
+        return sample_count / FINGERPRINT_RATE  # Only covers the fingerprinted part
+
+
+def same_audio(fp_a, fp_b):
+    """Compare two fingerprints of the same kind (chromaprint or energy bits)"""
+    if fp_a.startswith('cp:') != fp_b.startswith('cp:'):
+        return False  # Indexed with and without fpcalc, not comparable
+    if fp_a.startswith('cp:'):
+        return _chromaprint_error(fp_a, fp_b) <= CHROMAPRINT_MAX_ERROR
+    compared = errors = 0
+    for a, b in zip(fp_a, fp_b):
+        if a != '-' and b != '-':
+            compared += 1
+            errors += a != b
+    return compared >= MIN_FINGERPRINT_BITS and errors / compared <= MAX_BIT_ERROR
+
+
+def _chromaprint_error(fp_a, fp_b):
+    """Lowest bit error rate between two chromaprint fingerprints over small alignment offsets"""
+    items_a = [int(item) for item in fp_a[3:].split(',')]
+    items_b = [int(item) for item in fp_b[3:].split(',')]
+    best = 1.0
+    for offset in range(-CHROMAPRINT_MAX_OFFSET, CHROMAPRINT_MAX_OFFSET + 1):
+        pairs = list(zip(items_a[max(offset, 0):], items_b[max(-offset, 0):]))
+        if len(pairs) * 32 < MIN_FINGERPRINT_BITS:
+            continue
+        errors = sum(bin((a ^ b) & 0xFFFFFFFF).count('1') for a, b in pairs)
+        best = min(best, errors / (len(pairs) * 32))
+    return best
+
+
+class DedupIndex:
+    """Fingerprints of finished files, shared by every output folder that points at it"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL;')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, quick_hash TEXT, '
+            'content_hash TEXT, duration REAL, audio_fp TEXT, indexed_at REAL);'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS files_size ON files (size, quick_hash);')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS files_duration ON files (duration);')
+        self.conn.commit()
+
+    def _row(self, path):
+        with self.lock:
+            return self.conn.execute(
+                'SELECT size, mtime, quick_hash, content_hash, duration, audio_fp FROM files WHERE path = ?;',
+                (path,)
+            ).fetchone()
+
+    def fingerprint(self, path):
+        """Return the stored fingerprints of path, computing them if the file is new or changed"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self._row(path)
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            return {'size': row[0], 'quick_hash': row[2], 'content_hash': row[3], 'duration': row[4], 'audio_fp': row[5]}
+
+        record = {'size': stat.st_size, 'quick_hash': quick_hash(path, stat.st_size), 'content_hash': None,
+                  'duration': None, 'audio_fp': None}
+        if path.lower().endswith('.mp3'):
+            record['duration'], record['audio_fp'] = audio_fingerprint(path)
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO files (path, size, mtime, quick_hash, content_hash, duration, audio_fp, indexed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?);',
+                (path, stat.st_size, stat.st_mtime, record['quick_hash'], None, record['duration'],
+                 record['audio_fp'], time.time())
+            )
+            self.conn.commit()
+        return record
+
+    def _content_hash(self, path):
+        """Full hash of an indexed file, computed once and stored"""
+        row = self._row(path)
+        if row and row[3]:
+            return row[3]
+        digest = content_hash(path)
+        with self.lock:
+            self.conn.execute('UPDATE files SET content_hash = ? WHERE path = ?;', (digest, path))
+            self.conn.commit()
+        return digest
+
+    def _forget_missing(self, paths):
+        with self.lock:
+            self.conn.executemany('DELETE FROM files WHERE path = ?;', [(path,) for path in paths])
+            self.conn.commit()
+
+    def find_duplicate(self, path):
+        """Return (original path, 'content'|'audio') of an indexed duplicate of path, or (None, None)"""
+        path = os.path.abspath(path)
+        record = self.fingerprint(path)
+        missing = []
+        try:
+            with self.lock:
+                same_bytes = self.conn.execute(
+                    'SELECT path FROM files WHERE size = ? AND quick_hash = ? AND path != ? ORDER BY indexed_at;',
+                    (record['size'], record['quick_hash'], path)
+                ).fetchall()
+            for (candidate,) in same_bytes:
+                if not os.path.exists(candidate):
+                    missing.append(candidate)
+                elif self._content_hash(candidate) == self._content_hash(path):
+                    return candidate, 'content'
+
+            if record['audio_fp']:
+                with self.lock:
+                    similar = self.conn.execute(
+                        'SELECT path, audio_fp FROM files WHERE audio_fp IS NOT NULL AND path != ? '
+                        'AND duration BETWEEN ? AND ? ORDER BY indexed_at;',
+                        (path, record['duration'] - DURATION_TOLERANCE, record['duration'] + DURATION_TOLERANCE)
+                    ).fetchall()
+                for candidate, bits in similar:
+                    if not os.path.exists(candidate):
+                        missing.append(candidate)
+                    elif same_audio(record['audio_fp'], bits):
+                        return candidate, 'audio'
+            return None, None
+        finally:
+            if missing:
+                self._forget_missing(missing)
+
+    def forget(self, path):
+        self._forget_missing([os.path.abspath(path)])
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def hardlink(duplicate, original):
+    """Replace duplicate by a hard link to original; returns False when they cannot share storage"""
+    temp_path = duplicate + '.dedup_temp'
+    try:
+        os.link(original, temp_path)
+    except OSError:
+        return False  # Different filesystems or no hard link support
+    os.replace(temp_path, duplicate)
+    return True
+
+
+def deduplicate_files(index, paths, mode='hardlink', on_skip=None):
+    """Check finished files against the index; returns (messages, bytes freed, bytes only reported).
+
+    mode 'hardlink' links byte-identical duplicates to the original, 'skip' deletes every duplicate
+    (on_skip is then called with (duplicate, original) so the caller can point its records at the
+    original), and 'report' only lists them. Audio-only matches are never deleted unless mode is 'skip'."""
+    messages = []
+    saved = 0
+    reclaimable = 0
+    originals = set()  # Files kept as the original of an earlier duplicate
+    for path in paths:
+        if not os.path.isfile(path) or os.path.abspath(path) in originals:
+            continue
+        original, match = index.find_duplicate(path)
+        if not original or os.path.samefile(path, original):
+            continue  # Unique, or already a hard link to the original
+        originals.add(original)
+        name = os.path.basename(path)
+        size = os.path.getsize(path)
+        if mode == 'hardlink' and match == 'content' and hardlink(path, original):
+            saved += size
+            messages.append(f"Hardlinked duplicate: {name} -> {original}")
+        elif mode == 'skip':
+            os.remove(path)
+            index.forget(path)
+            saved += size
+            if on_skip:
+                on_skip(path, original)
+            messages.append(f"Removed duplicate ({match}): {name}, kept {original}")
+        else:
+            # Report mode, or a match hardlink mode cannot act on (audio-only, other filesystem)
+            reclaimable += size
+            messages.append(f"Duplicate ({match}): {name} = {original}")
+    return messages, saved, reclaimable
+
+
+def scan(index, folders, workers=4):
+    """Index every media file of the given folders on a thread pool"""
+    paths = []
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(MEDIA_EXTENSIONS))
+    # ffmpeg decoding and file reads release the GIL, so threads keep several disks/cores busy
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(index.fingerprint, paths))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find duplicate downloads across output folders")
+    parser.add_argument("folders", nargs="+", help="Output folders to scan")
+    parser.add_argument("--index", default=os.path.join(os.getcwd(), "config", "dedup.db"), help="Dedup index file")
+    parser.add_argument("--apply", choices=("hardlink", "skip"), help="Hardlink or delete the duplicates found")
+    parser.add_argument("--workers", type=int, default=4, help="Files fingerprinted at the same time (default: 4)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.index)), exist_ok=True)
+    index = DedupIndex(args.index)
+    try:
+        paths = scan(index, args.folders, args.workers)
+        print(f"Indexed {len(paths)} file(s)")
+        messages, saved, reclaimable = deduplicate_files(index, sorted(paths), args.apply or 'report')
+    finally:
+        index.close()
+    for message in messages:
+        print(message)
+    print(f"{len(messages)} duplicate(s), {saved / (1024 * 1024):.1f} MiB freed, "
+          f"{reclaimable / (1024 * 1024):.1f} MiB reported only")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import threading
+
+
+class FilePool:
+    """Runs a worker function on files as soon as they are submitted and reports each completion.
+
+    Subclasses pick the executor (threads or processes) and the worker; the completion callbacks,
+    duplicate filtering and join logic live here once."""
+
+    def __init__(self, executor_class, worker, workers=None, callback=None):
+        self.executor_class = executor_class
+        self.worker = worker  # Called in the pool as worker(path, *args), returns a result message
+        self.workers = workers
+        self.callback = callback  # Called with (path, result message) for every finished file
+        self.pool = None  # Created on the first submit
+        self.futures = []
+        self.queued = set()  # Prevent duplicate processing
+        self.lock = threading.Lock()
+        self.reported = threading.Condition(self.lock)  # Signalled when a completion callback has run
+        self.pending = 0
+
+    def error_message(self, path, error):
+        """Result message of a worker that raised instead of returning one"""
+        return f"Error processing {path}: {str(error)}"
+
+    def submit(self, path, *args):
+        """Queue a file; safe to call from download and worker threads"""
+        with self.lock:
+            if path in self.queued:
+                return
+            self.queued.add(path)
+            if self.pool is None:
+                self.pool = self.executor_class(max_workers=self.workers)
+            future = self.pool.submit(self.worker, path, *args)
+            self.futures.append((path, future))
+            self.pending += 1
+        future.add_done_callback(lambda done: self._report(path, done))
+
+    def _result(self, path, future):
+        try:
+            return future.result()
+        except Exception as e:
+            return self.error_message(path, e)
+
+    def _report(self, path, future):
+        """Report the completion of a single file"""
+        message = self._result(path, future)
+        try:
+            if self.callback:
+                self.callback(path, message)
+        finally:
+            with self.lock:
+                self.pending -= 1
+                self.reported.notify_all()
+
+    def join(self):
+        """Wait for every queued file and return the result messages"""
+        with self.lock:
+            # Results can be ready before their callbacks have run, so wait for the callbacks too
+            self.reported.wait_for(lambda: self.pending == 0)
+            futures = list(self.futures)
+        results = [self._result(path, future) for path, future in futures]
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        return results
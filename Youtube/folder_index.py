@@ -0,0 +1,82 @@
+import os
+import threading
+
+COMPLETE_SIZE = 1024  # Smaller files are leftovers of failed downloads, as in normalization.is_complete_file
+
+
+class FolderIndex:
+    """Snapshot of an output folder taken with one scandir, kept current as files are written"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.folder_key = self._key(folder)
+        self.lock = threading.Lock()  # Download, tagging and normalization workers refresh entries
+        self.files = {}  # Normalized file name -> (size, mtime)
+        self.rescan()
+
+    def _key(self, path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def _name(self, path):
+        """Index key of path, or None when it lives outside the indexed folder"""
+        directory, name = os.path.split(self._key(path))
+        return name if directory == self.folder_key else None
+
+    def rescan(self):
+        """Rebuild the snapshot with a single directory listing"""
+        files = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            files[os.path.normcase(entry.name)] = (stat.st_size, stat.st_mtime)
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            pass
+        with self.lock:
+            self.files = files
+
+    def refresh(self, paths):
+        """Re-stat files that were just written, replaced or removed"""
+        for path in paths:
+            if not path:
+                continue
+            name = self._name(path)
+            if name is None:
+                continue
+            try:
+                stat = os.stat(path)
+                with self.lock:
+                    self.files[name] = (stat.st_size, stat.st_mtime)
+            except OSError:
+                with self.lock:
+                    self.files.pop(name, None)
+
+    def stat(self, path):
+        """(size, mtime) of path, or None when it does not exist"""
+        name = self._name(path)
+        if name is None:
+            # Not part of the snapshot (e.g. a custom output template), ask the filesystem
+            try:
+                stat = os.stat(path)
+                return (stat.st_size, stat.st_mtime)
+            except OSError:
+                return None
+        with self.lock:
+            return self.files.get(name)
+
+    def exists(self, path):
+        return self.stat(path) is not None
+
+    def size(self, path):
+        """Size of path, or None when it does not exist"""
+        stat = self.stat(path)
+        return stat[0] if stat else None
+
+    def is_complete(self, path):
+        """Check if file exists and has reasonable size"""
+        size = self.size(path)
+        return size is not None and size > COMPLETE_SIZE
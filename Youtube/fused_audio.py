@@ -0,0 +1,85 @@
+import os
+import subprocess
+from yt_dlp.postprocessor.common import PostProcessor, PostProcessingError
+from normalization import (LOUDNORM_TARGET, LoudnessCache, cached_measurement, audio_hash, is_complete_file,
+                           loudnorm_filter, meets_target, output_measurement)
+
+AUDIO_QUALITY = '192'  # kbit/s, as FFmpegExtractAudio was configured
+
+
+class FusedAudioPP(PostProcessor):
+    """Transcode to MP3, normalize loudness and write tags and cover art in a single ffmpeg run,
+    so the final file is written once instead of once per post-processing step"""
+
+    def __init__(self, downloader=None, describe=None, on_done=None, quality=AUDIO_QUALITY,
+                 normalize=True, two_pass=False, cache_path=None, target=LOUDNORM_TARGET):
+        super().__init__(downloader)
+        self.describe = describe  # Called with (info, mp3 path), returns (tags, cover path)
+        self.on_done = on_done  # Called with (mp3 path, normalized) after a successful run
+        self.quality = quality
+        self.normalize = normalize
+        self.two_pass = two_pass
+        self.cache_path = cache_path
+        self.target = target
+
+    def run(self, info):
+        source = info['filepath']
+        target_path = os.path.splitext(source)[0] + '.mp3'
+        temp_path = os.path.splitext(source)[0] + '_fused_temp.mp3'
+        tags, cover_path = self.describe(info, target_path) if self.describe else ({}, None)
+
+        cache = LoudnessCache(self.cache_path) if self.normalize and self.two_pass and self.cache_path else None
+        try:
+            audio_filter = None
+            if self.normalize:
+                measurement = None
+                if self.two_pass:
+                    # Measuring only reads the download; the output is still written once
+                    measurement, _ = cached_measurement(source, cache, self.target)
+                if measurement is None or not meets_target(measurement, self.target):
+                    audio_filter = loudnorm_filter(self.target, measurement)
+
+            cmd = ['ffmpeg', '-hide_banner', '-nostats', '-y', '-i', source]
+            if cover_path:
+                cmd += ['-i', cover_path]
+            cmd += ['-map', '0:a:0']
+            if cover_path:
+                cmd += ['-map', '1:v:0', '-c:v', 'copy', '-disposition:v', 'attached_pic',
+                        '-metadata:s:v', 'title=Cover', '-metadata:s:v', 'comment=Cover (front)']
+            if audio_filter:
+                cmd += ['-af', audio_filter]
+            cmd += ['-c:a', 'libmp3lame', '-b:a', f"{self.quality}k", '-id3v2_version', '3']
+            for key in ('title', 'artist', 'album', 'date'):
+                if tags.get(key):
+                    cmd += ['-metadata', f"{key}={tags[key]}"]
+            cmd += ['-f', 'mp3', temp_path]
+
+            self.to_screen(f"Transcoding, normalizing and tagging in one pass: {os.path.basename(target_path)}")
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            if result.returncode != 0 or not is_complete_file(temp_path):
+                error_msg = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "Unknown ffmpeg error"
+                raise PostProcessingError(f"ffmpeg failed for {os.path.basename(source)}: {error_msg}")
+            os.replace(temp_path, target_path)
+
+            if cache and audio_filter:
+                # Like the two-pass normalizer: later runs find the output already measured
+                cache.put(audio_hash(target_path), self.target, output_measurement(result.stderr))
+        except subprocess.TimeoutExpired:
+            raise PostProcessingError(f"ffmpeg timeout for {os.path.basename(source)}")
+        except (OSError, RuntimeError, ValueError) as e:
+            raise PostProcessingError(f"Audio processing error for {os.path.basename(source)}: {str(e)}")
+        finally:
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            if cache:
+                cache.close()
+
+        info['filepath'] = target_path
+        info['ext'] = 'mp3'
+        if self.on_done:
+            self.on_done(target_path, self.normalize)
+        # The downloaded container and the embedded cover are no longer needed
+        return [path for path in (source, cover_path) if path and path != target_path], info
@@ -0,0 +1,121 @@
+import re
+import time
+import threading
+from contextlib import contextmanager
+
+FRAGMENT_WORKERS = 4  # Concurrent fragment downloads per stream (DASH/HLS)
+BASE_DELAY = 5  # Seconds of back-off after the first throttling response
+MAX_DELAY = 300
+THROTTLE_RETRIES = 3  # Extra attempts for an entry that failed because it was throttled
+THROTTLE_PATTERN = re.compile(r'HTTP Error (429|403)')
+
+
+class DownloadGovernor:
+    """Shares one bandwidth cap between every active download and backs off when the server throttles"""
+
+    def __init__(self, max_bandwidth=0, fragment_workers=FRAGMENT_WORKERS, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+        self.max_bandwidth = max_bandwidth  # Bytes per second for all downloads together, 0 = unlimited
+        self.fragment_workers = fragment_workers
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.sessions = {}  # id() -> YoutubeDL instance currently downloading
+        self.delay = 0  # Current back-off, doubled on every throttling response
+        self.resume_at = 0
+        self.local = threading.local()  # Throttling seen by the download running on this thread
+
+    def options(self):
+        """yt-dlp options applied to every session under this governor"""
+        return {
+            'concurrent_fragment_downloads': self.fragment_workers,
+            'retry_sleep_functions': {'http': self._retry_sleep, 'fragment': self._retry_sleep},
+            'logger': GovernorLogger(self),
+        }
+
+    def set_max_bandwidth(self, max_bandwidth):
+        """Change the cap; running downloads pick up their new share on the next chunk"""
+        with self.lock:
+            self.max_bandwidth = max_bandwidth
+            self._rebalance()
+
+    @contextmanager
+    def download(self, ydl):
+        """Run one download in ydl, waiting out any back-off and taking a share of the bandwidth"""
+        self._wait_for_backoff()
+        self.local.throttled = False
+        with self.lock:
+            self.sessions[id(ydl)] = ydl
+            self._rebalance()
+        try:
+            yield
+        finally:
+            with self.lock:
+                del self.sessions[id(ydl)]
+                self._rebalance()
+            if not self.local.throttled:
+                self._recover()
+
+    def was_throttled(self):
+        """Whether the last download on this thread hit a 429/403 response"""
+        return getattr(self.local, 'throttled', False)
+
+    def report(self, message):
+        """Inspect a yt-dlp warning or error for throttling responses"""
+        if THROTTLE_PATTERN.search(message):
+            self.local.throttled = True
+            self._back_off()
+
+    def _rebalance(self):
+        """Split the cap evenly; yt-dlp reads 'ratelimit' from the session params on every chunk"""
+        share = self.max_bandwidth // len(self.sessions) if self.max_bandwidth and self.sessions else None
+        for ydl in self.sessions.values():
+            ydl.params['ratelimit'] = share
+
+    def _back_off(self):
+        with self.lock:
+            self.delay = min(self.max_delay, self.delay * 2 or self.base_delay)
+            self.resume_at = max(self.resume_at, time.monotonic() + self.delay)
+            delay = self.delay
+        print(f"Throttled by the server, pausing new downloads for {delay}s")
+
+    def _recover(self):
+        """Halve the back-off after a clean download"""
+        with self.lock:
+            self.delay = self.delay // 2 if self.delay > self.base_delay else 0
+
+    def _wait_for_backoff(self):
+        while True:
+            with self.lock:
+                remaining = self.resume_at - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def _retry_sleep(self, n):
+        """Sleep before yt-dlp's own retry number n of a request or fragment"""
+        with self.lock:
+            return max(self.delay, min(self.max_delay, 2 ** n))
+
+
+class GovernorLogger:
+    """yt-dlp logger that prints like the default output and feeds errors to the governor"""
+
+    def __init__(self, governor):
+        self.governor = governor
+
+    def debug(self, msg):
+        # Progress lines would flood the console once they can no longer overwrite each other
+        if msg.startswith('[debug] ') or (msg.startswith('[download]') and ' ETA ' in msg):
+            return
+        print(msg)
+
+    def info(self, msg):
+        print(msg)
+
+    def warning(self, msg):
+        self.governor.report(msg)
+        print(f"WARNING: {msg}")
+
+    def error(self, msg):
+        self.governor.report(msg)
+        print(msg)
@@ -0,0 +1,90 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+import yt_dlp
+
+CACHE_NAME = '.info_cache.db'
+DEFAULT_TTL = 6 * 60 * 60  # Seconds an extraction is served from the cache
+LOOKUP_CHUNK = 500  # Stay below SQLite's bound parameter limit
+# Options that change what an extraction returns
+FINGERPRINT_KEYS = ('format', 'extract_flat', 'noplaylist', 'playliststart', 'playlistend', 'playlist_items', 'cookiefile')
+# Bulky fields that are never needed for skip checks, previews or tagging; stream URLs expire anyway
+STRIPPED_KEYS = ('formats', 'requested_formats', 'automatic_captions', 'subtitles', 'heatmap', 'http_headers', 'url', 'fragments')
+
+
+def options_fingerprint(opts):
+    """Short hash of the yt-dlp options that affect extraction results"""
+    relevant = {key: opts.get(key) for key in FINGERPRINT_KEYS if opts.get(key) is not None}
+    return hashlib.sha1(json.dumps(relevant, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+def _compact(info):
+    """JSON-safe copy of an info dict without the fields that are not worth caching"""
+    info = yt_dlp.YoutubeDL.sanitize_info(info)
+    entries = info.get('entries')
+    info = {key: value for key, value in info.items() if key not in STRIPPED_KEYS or info.get('_type') == 'url'}
+    if entries is not None:
+        info['entries'] = [_compact(entry) if entry else entry for entry in entries]
+    return info
+
+
+class InfoCache:
+    """On-disk cache of extracted info dicts, keyed by video ID (or URL) and options fingerprint"""
+
+    def __init__(self, folder, ttl=DEFAULT_TTL):
+        self.db_path = os.path.join(folder, CACHE_NAME)
+        self.ttl = ttl
+        self.lock = threading.Lock()  # Download workers store results from several threads
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS info ('
+            'key TEXT NOT NULL, fingerprint TEXT NOT NULL, data BLOB NOT NULL, fetched_at REAL NOT NULL, '
+            'PRIMARY KEY (key, fingerprint));'
+        )
+        self.evict()
+
+    def evict(self):
+        """Drop every expired extraction"""
+        with self.lock:
+            self.conn.execute('DELETE FROM info WHERE fetched_at < ?;', (time.time() - self.ttl,))
+            self.conn.commit()
+
+    def get(self, key, fingerprint):
+        """Cached info dict for key, or None when missing or expired"""
+        return self.get_many([key], fingerprint).get(key)
+
+    def get_many(self, keys, fingerprint):
+        """Return {key: info dict} for the keys with a fresh cached extraction"""
+        keys = [key for key in dict.fromkeys(keys) if key]
+        found = {}
+        with self.lock:
+            for start in range(0, len(keys), LOOKUP_CHUNK):
+                chunk = keys[start:start + LOOKUP_CHUNK]
+                rows = self.conn.execute(
+                    f"SELECT key, data FROM info WHERE fingerprint = ? AND fetched_at >= ? "
+                    f"AND key IN ({', '.join('?' for _ in chunk)});",
+                    (fingerprint, time.time() - self.ttl, *chunk)
+                ).fetchall()
+                for key, data in rows:
+                    found[key] = json.loads(zlib.decompress(data))
+        return found
+
+    def put(self, key, fingerprint, info):
+        self.put_many([(key, info)], fingerprint)
+
+    def put_many(self, items, fingerprint):
+        """Store (key, info dict) pairs in one transaction"""
+        now = time.time()
+        rows = [(key, fingerprint, zlib.compress(json.dumps(_compact(info)).encode('utf-8')), now)
+                for key, info in items if key and info]
+        with self.lock:
+            self.conn.executemany('INSERT OR REPLACE INTO info VALUES (?, ?, ?, ?);', rows)
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,104 @@
+import os
+import time
+import sqlite3
+import threading
+
+JOURNAL_NAME = '.download_journal.db'
+# Download stages in order; tagging and normalization are tracked as separate flags
+# because they run independently once an entry is post-processed
+STAGES = ('queued', 'downloading', 'downloaded', 'post_processed')
+LOOKUP_CHUNK = 500  # Stay below SQLite's bound parameter limit
+
+
+class DownloadJournal:
+    """Crash-safe record of how far every playlist entry got, updated in atomic transactions"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.db_path = os.path.join(folder, JOURNAL_NAME)
+        self.lock = threading.Lock()  # Download and normalization workers update from several threads
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL;')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'video_id TEXT NOT NULL, kind TEXT NOT NULL, stage TEXT NOT NULL, filepath TEXT, size INTEGER, '
+            'tagged INTEGER DEFAULT 0, normalized INTEGER DEFAULT 0, updated_at REAL, '
+            'PRIMARY KEY (video_id, kind));'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS entries_filepath ON entries (filepath);')
+        self.conn.commit()
+
+    def lookup(self, video_ids, kind):
+        """Return {video_id: record} for the given IDs"""
+        video_ids = [video_id for video_id in dict.fromkeys(video_ids) if video_id]
+        records = {}
+        with self.lock:
+            for start in range(0, len(video_ids), LOOKUP_CHUNK):
+                chunk = video_ids[start:start + LOOKUP_CHUNK]
+                rows = self.conn.execute(
+                    f"SELECT video_id, stage, filepath, size, tagged, normalized FROM entries "
+                    f"WHERE kind = ? AND video_id IN ({', '.join('?' for _ in chunk)});",
+                    (kind, *chunk)
+                ).fetchall()
+                for video_id, stage, filepath, size, tagged, normalized in rows:
+                    records[video_id] = {
+                        'stage': stage,
+                        'path': filepath,
+                        'size': size,
+                        'tagged': bool(tagged),
+                        'normalized': bool(normalized),
+                    }
+        return records
+
+    def queue(self, video_ids, kind):
+        """Register entries about to be downloaded without resetting entries that got further"""
+        rows = [(video_id, kind, 'queued', time.time()) for video_id in video_ids if video_id]
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO entries (video_id, kind, stage, updated_at) VALUES (?, ?, ?, ?);',
+                rows
+            )
+            self.conn.commit()
+
+    def set_stage(self, video_id, kind, stage, filepath=None):
+        """Move an entry to a download stage, recording its file and size when given"""
+        if not video_id:
+            return
+        size = _file_size(filepath)
+        with self.lock:
+            self.conn.execute(
+                'INSERT INTO entries (video_id, kind, stage, filepath, size, updated_at) VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (video_id, kind) DO UPDATE SET stage = excluded.stage, '
+                'filepath = COALESCE(excluded.filepath, filepath), size = COALESCE(excluded.size, size), '
+                # A fresh download invalidates earlier tagging/normalization of the old file
+                "tagged = CASE WHEN excluded.stage = 'downloading' THEN 0 ELSE tagged END, "
+                "normalized = CASE WHEN excluded.stage = 'downloading' THEN 0 ELSE normalized END, "
+                'updated_at = excluded.updated_at;',
+                (video_id, kind, stage, filepath, size, time.time())
+            )
+            self.conn.commit()
+
+    def mark_done(self, filepath, step):
+        """Flag the entry owning filepath as 'tagged' or 'normalized' and refresh its size"""
+        if step not in ('tagged', 'normalized'):
+            raise ValueError(f"Unknown journal step: {step}")
+        with self.lock:
+            self.conn.execute(
+                f"UPDATE entries SET {step} = 1, size = ?, updated_at = ? WHERE filepath = ?;",
+                (_file_size(filepath), time.time(), filepath)
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _file_size(filepath):
+    """Size of filepath, or None when it is missing"""
+    if not filepath:
+        return None
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return None
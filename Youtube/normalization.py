@@ -0,0 +1,273 @@
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from file_pool import FilePool
+
+
+LOUDNORM_TARGET = {'I': -16.0, 'TP': -1.5, 'LRA': 11.0}
+I_TOLERANCE = 1.0  # LU around the integrated loudness target that counts as normalized
+TP_TOLERANCE = 0.5  # dB above the true peak target that counts as normalized
+MEASUREMENT_KEYS = ('input_i', 'input_tp', 'input_lra', 'input_thresh', 'target_offset')
+
+
+def is_complete_file(filepath):
+    """Check if file exists and has reasonable size"""
+    if not os.path.exists(filepath):
+        return False
+
+    # Check if file size is reasonable (> 1KB)
+    try:
+        return os.path.getsize(filepath) > 1024
+    except OSError:
+        return False
+
+
+def normalize_file(input_path, two_pass=False, cache_path=None):
+    """Normalize audio using ffmpeg loudnorm filter (module level so worker processes can run it)"""
+    if two_pass:
+        return normalize_file_two_pass(input_path, cache_path)
+
+    if not is_complete_file(input_path):
+        return f"Error: File not found - {os.path.basename(input_path)}"
+
+    temp_path = input_path.replace('.mp3', '_normalized_temp.mp3')
+
+    try:
+        cmd = [
+            'ffmpeg', '-i', input_path,
+            '-af', 'loudnorm=I=-16:TP=-1.5:LRA=11',
+            '-y', temp_path
+        ]
+
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+
+        if result.returncode == 0 and is_complete_file(temp_path):
+            # Replace original with normalized version
+            try:
+                os.replace(temp_path, input_path)
+                return f"Normalized: {os.path.basename(input_path)}"
+            except OSError as e:
+                return f"Error replacing file: {str(e)}"
+        else:
+            # Clean up temp file if it exists
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+            error_msg = result.stderr if result.stderr else "Unknown ffmpeg error"
+            return f"Normalization failed for {os.path.basename(input_path)}: {error_msg}"
+
+    except subprocess.TimeoutExpired:
+        # Clean up temp file
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        return f"Normalization timeout for {os.path.basename(input_path)}"
+
+    except Exception as e:
+        return f"Normalization error for {os.path.basename(input_path)}: {str(e)}"
+
+
+def _remove_quietly(path):
+    """Remove a temporary file, ignoring errors"""
+    if os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def audio_hash(filepath, chunk_size=1024 * 1024):
+    """SHA-256 of the audio data, without the ID3v2 header and ID3v1 trailer.
+
+    Tagging after normalization rewrites the tags only, so the cache key survives it."""
+    size = os.path.getsize(filepath)
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        start = 0
+        header = f.read(10)
+        if len(header) == 10 and header[:3] == b'ID3':
+            # Tag size is a 28-bit syncsafe integer; a footer adds another 10 bytes
+            start = 10 + ((header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9])
+            if header[5] & 0x10:
+                start += 10
+        end = size
+        if size - start >= 128:
+            f.seek(size - 128)
+            if f.read(3) == b'TAG':
+                end = size - 128
+        f.seek(start)
+        remaining = max(0, end - start)
+        while remaining:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def target_key(target):
+    """Stable string form of the loudnorm target parameters"""
+    return f"I={target['I']}:TP={target['TP']}:LRA={target['LRA']}"
+
+
+def meets_target(measurement, target):
+    """Check whether measured loudness is already close enough to the target"""
+    return (abs(measurement['input_i'] - target['I']) <= I_TOLERANCE
+            and measurement['input_tp'] <= target['TP'] + TP_TOLERANCE)
+
+
+def _parse_loudnorm_json(stderr):
+    """Extract the JSON block printed by loudnorm with print_format=json"""
+    matches = re.findall(r'\{[^{}]*"input_i"[^{}]*\}', stderr)
+    if not matches:
+        raise ValueError("loudnorm did not report any measurement")
+    return {key: float(value) for key, value in json.loads(matches[-1]).items()
+            if key.startswith(('input_', 'output_', 'target_'))}
+
+
+def loudnorm_filter(target=LOUDNORM_TARGET, measurement=None):
+    """loudnorm filter string: dynamic without a measurement, linear second pass with one"""
+    if measurement is None:
+        return f"loudnorm={target_key(target)}:print_format=json"
+    return (
+        f"loudnorm={target_key(target)}"
+        f":measured_I={measurement['input_i']}:measured_TP={measurement['input_tp']}"
+        f":measured_LRA={measurement['input_lra']}:measured_thresh={measurement['input_thresh']}"
+        f":offset={measurement['target_offset']}:linear=true:print_format=json"
+    )
+
+
+def output_measurement(stderr):
+    """Loudness of a loudnorm output, stored like a first-pass measurement of the new file"""
+    output = _parse_loudnorm_json(stderr)
+    return {
+        'input_i': output['output_i'],
+        'input_tp': output['output_tp'],
+        'input_lra': output['output_lra'],
+        'input_thresh': output['output_thresh'],
+        'target_offset': output['target_offset'],
+    }
+
+
+def cached_measurement(input_path, cache=None, target=LOUDNORM_TARGET):
+    """Return (measurement, cached), measuring and caching the file on a cache miss"""
+    content_hash = audio_hash(input_path) if cache else None
+    measurement = cache.get(content_hash, target) if cache else None
+    if measurement is not None:
+        return measurement, True
+    measurement = measure_loudness(input_path, target)
+    if cache:
+        cache.put(content_hash, target, measurement)
+    return measurement, False
+
+
+def measure_loudness(input_path, target=LOUDNORM_TARGET):
+    """First loudnorm pass: analyse the file without writing any output"""
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats', '-i', input_path,
+        '-af', f"loudnorm={target_key(target)}:print_format=json",
+        '-f', 'null', '-'
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr or "Unknown ffmpeg error")
+    measured = _parse_loudnorm_json(result.stderr)
+    return {key: measured[key] for key in MEASUREMENT_KEYS}
+
+
+class LoudnessCache:
+    """Persistent first-pass loudnorm measurements keyed by file content hash and target"""
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path, timeout=30)  # Shared by several worker processes
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS measurements ('
+            'content_hash TEXT, target TEXT, input_i REAL, input_tp REAL, input_lra REAL, '
+            'input_thresh REAL, target_offset REAL, PRIMARY KEY (content_hash, target));'
+        )
+        self.conn.commit()
+
+    def get(self, content_hash, target):
+        row = self.conn.execute(
+            f"SELECT {', '.join(MEASUREMENT_KEYS)} FROM measurements WHERE content_hash = ? AND target = ?;",
+            (content_hash, target_key(target))
+        ).fetchone()
+        return dict(zip(MEASUREMENT_KEYS, row)) if row else None
+
+    def put(self, content_hash, target, measurement):
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO measurements (content_hash, target, {', '.join(MEASUREMENT_KEYS)}) "
+            f"VALUES (?, ?, {', '.join('?' for _ in MEASUREMENT_KEYS)});",
+            (content_hash, target_key(target), *(measurement[key] for key in MEASUREMENT_KEYS))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def normalize_file_two_pass(input_path, cache_path=None, target=LOUDNORM_TARGET):
+    """Measure (or reuse a cached measurement), then apply a linear second loudnorm pass"""
+    name = os.path.basename(input_path)
+    if not is_complete_file(input_path):
+        return f"Error: File not found - {name}"
+
+    temp_path = input_path.replace('.mp3', '_normalized_temp.mp3')
+    cache = LoudnessCache(cache_path) if cache_path else None
+    try:
+        measurement, cached = cached_measurement(input_path, cache, target)
+        if meets_target(measurement, target):
+            return f"Already normalized{' (cached)' if cached else ''}: {name}"
+
+        loudnorm = loudnorm_filter(target, measurement)
+        cmd = ['ffmpeg', '-hide_banner', '-nostats', '-i', input_path, '-af', loudnorm, '-y', temp_path]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+
+        if result.returncode != 0 or not is_complete_file(temp_path):
+            _remove_quietly(temp_path)
+            error_msg = result.stderr if result.stderr else "Unknown ffmpeg error"
+            return f"Normalization failed for {name}: {error_msg}"
+
+        os.replace(temp_path, input_path)
+        if cache:
+            # The second pass reports the output loudness, so the next run can skip this file unmeasured
+            cache.put(audio_hash(input_path), target, output_measurement(result.stderr))
+        return f"Normalized: {name}"
+
+    except subprocess.TimeoutExpired:
+        _remove_quietly(temp_path)
+        return f"Normalization timeout for {name}"
+
+    except Exception as e:
+        _remove_quietly(temp_path)
+        return f"Normalization error for {name}: {str(e)}"
+
+    finally:
+        if cache:
+            cache.close()
+
+
+class NormalizationPipeline(FilePool):
+    """Normalizes audio files in a process pool as soon as they are queued"""
+
+    def __init__(self, callback=None, workers=None, two_pass=False, cache_path=None):
+        super().__init__(ProcessPoolExecutor, normalize_file, workers or os.cpu_count() or 1, callback)
+        self.two_pass = two_pass
+        self.cache_path = cache_path
+
+    def submit(self, input_path):
+        """Queue a file for normalization; safe to call from download worker threads"""
+        super().submit(input_path, self.two_pass, self.cache_path)
+
+    def error_message(self, input_path, error):
+        return f"Normalization error: {str(error)}"
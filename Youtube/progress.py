@@ -0,0 +1,126 @@
+import time
+import threading
+
+MAX_RATE = 4  # Progress snapshots per second delivered to the listener
+
+
+class ProgressReporter:
+    """Coalesces yt-dlp progress hook calls into numeric snapshots sent at most max_rate times per second"""
+
+    def __init__(self, listener, max_rate=MAX_RATE, clock=time.monotonic):
+        self.listener = listener
+        self.interval = 1.0 / max_rate
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries = {}  # Entry id -> {'title', 'files': {filename: stats}, 'finished'}
+        self.total_entries = 0
+        self.completed = 0
+        self.last_emit = None
+
+    def start(self, total_entries):
+        """Reset the aggregate for a run downloading total_entries entries"""
+        with self.lock:
+            self.entries = {}
+            self.total_entries = total_entries
+            self.completed = 0
+            self.last_emit = None
+
+    def update(self, d):
+        """Record one progress hook call and emit a snapshot if the rate limit allows it"""
+        info = d.get('info_dict') or {}
+        entry_id = info.get('id') or d.get('filename', 'unknown')
+        with self.lock:
+            entry = self.entries.setdefault(entry_id, {'title': info.get('title', ''), 'files': {}, 'finished': False})
+            active = d['status'] == 'downloading'
+            entry['files'][d.get('filename', '')] = {
+                'downloaded_bytes': d.get('downloaded_bytes') or 0,
+                'total_bytes': d.get('total_bytes') or d.get('total_bytes_estimate') or 0,
+                'speed': (d.get('speed') or 0) if active else 0,
+                'eta': (d.get('eta') or 0) if active else 0,
+                'status': d['status'],
+            }
+            # State changes always go through; byte counters are throttled
+            force = not active
+        self._emit(force)
+
+    def entry_finished(self, entry_id):
+        """Count an entry as complete (download and post-processing finished or failed)"""
+        with self.lock:
+            entry = self.entries.setdefault(entry_id, {'title': '', 'files': {}, 'finished': False})
+            if not entry['finished']:
+                entry['finished'] = True
+                self.completed += 1
+        self._emit(True)
+
+    def finish(self):
+        """Report the run as complete"""
+        with self.lock:
+            self.completed = self.total_entries
+        self._emit(True)
+
+    def snapshot(self):
+        """Aggregate progress of the run and of every active entry"""
+        with self.lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        entries = {}
+        done_fraction = 0.0
+        for entry_id, entry in self.entries.items():
+            files = entry['files'].values()
+            downloaded = sum(f['downloaded_bytes'] for f in files)
+            total = sum(f['total_bytes'] for f in files)
+            stats = {
+                'title': entry['title'],
+                'downloaded_bytes': downloaded,
+                'total_bytes': total,
+                'speed': sum(f['speed'] for f in files),
+                'eta': max((f['eta'] for f in files), default=0),
+                'finished': entry['finished'],
+            }
+            entries[entry_id] = stats
+            if not entry['finished'] and total:
+                done_fraction += min(1.0, downloaded / total)
+
+        active = [e for e in entries.values() if not e['finished']]
+        total_entries = max(self.total_entries, len(entries), 1)
+        return {
+            'percent': min(100.0, (self.completed + done_fraction) / total_entries * 100),
+            'completed': self.completed,
+            'total_entries': self.total_entries,
+            'downloaded_bytes': sum(e['downloaded_bytes'] for e in entries.values()),
+            'speed': sum(e['speed'] for e in active),
+            'eta': max((e['eta'] for e in active), default=0),
+            'entries': entries,
+        }
+
+    def _emit(self, force=False):
+        """Send a snapshot unless one was sent less than one interval ago"""
+        with self.lock:
+            now = self.clock()
+            if not force and self.last_emit is not None and now - self.last_emit < self.interval:
+                return
+            self.last_emit = now
+            snapshot = self._snapshot()
+        self.listener(snapshot)
+
+
+def format_bytes(num_bytes):
+    """Human readable byte count"""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if num_bytes < 1024 or unit == 'GiB':
+            return f"{num_bytes:.1f} {unit}" if unit != 'B' else f"{int(num_bytes)} B"
+        num_bytes /= 1024
+
+
+def format_progress(snapshot):
+    """One-line summary of a progress snapshot, e.g. '42.0% - 3/10 files - 2.1 MiB/s - ETA 0:15'"""
+    parts = [f"{snapshot['percent']:.1f}%"]
+    if snapshot['total_entries'] > 1:
+        parts.append(f"{snapshot['completed']}/{snapshot['total_entries']} files")
+    if snapshot['speed']:
+        parts.append(f"{format_bytes(snapshot['speed'])}/s")
+    if snapshot['eta']:
+        minutes, seconds = divmod(int(snapshot['eta']), 60)
+        parts.append(f"ETA {minutes}:{seconds:02d}")
+    return " - ".join(parts)
@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from mutagen.id3 import ID3, ID3NoHeaderError, TIT2, TPE1, TALB, TDRC, APIC
+from file_pool import FilePool
+
+TAG_WORKERS = 4
+COVER_MIME = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png'}
+
+
+def tag_file(filepath, tags, cover_path=None):
+    """Write every ID3 frame (and the cover art) to an MP3 with a single save"""
+    name = os.path.basename(filepath)
+    try:
+        try:
+            audio = ID3(filepath)
+        except ID3NoHeaderError:
+            audio = ID3()  # Create new ID3 tag if none exists
+
+        audio.setall('TIT2', [TIT2(encoding=3, text=tags['title'])])
+        audio.setall('TPE1', [TPE1(encoding=3, text=tags['artist'])])
+        audio.setall('TALB', [TALB(encoding=3, text=tags['album'])])
+        if tags.get('date'):
+            audio.setall('TDRC', [TDRC(encoding=3, text=tags['date'])])
+
+        mime = COVER_MIME.get(os.path.splitext(cover_path)[1].lower()) if cover_path else None
+        if mime and os.path.exists(cover_path):
+            with open(cover_path, 'rb') as cover:
+                audio.setall('APIC', [APIC(encoding=3, mime=mime, type=3, desc='Cover', data=cover.read())])
+
+        audio.save(filepath)
+
+        # The thumbnail only existed to be embedded
+        if mime and os.path.exists(cover_path):
+            try:
+                os.remove(cover_path)
+            except OSError:
+                pass
+        return f"Metadata updated: {name}"
+    except Exception as e:
+        return f"Error updating metadata for {name}: {str(e)}"
+
+
+class TaggingPool(FilePool):
+    """Tags audio files on a thread pool as soon as they are submitted"""
+
+    def __init__(self, callback=None, workers=TAG_WORKERS):
+        super().__init__(ThreadPoolExecutor, tag_file, workers, callback)
+
+    def submit(self, filepath, tags, cover_path=None):
+        """Queue a file for tagging; safe to call from download and normalization threads"""
+        super().submit(filepath, tags, cover_path)
+
+    def error_message(self, filepath, error):
+        return f"Error updating metadata for {os.path.basename(filepath)}: {str(error)}"